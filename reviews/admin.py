@@ -1,9 +1,48 @@
 from django.contrib import admin
-from .models import Review, ModerationResult, AIServiceError
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
+from .services import counters
+from .models import (Product, Review, ModerationResult, AIServiceError, ModerationOutbox, UserReputation,
+                     ModerationCounter, ModerationOverride, ReviewEdit, ModerationFailure)
+
+
+class CounterPaginator(Paginator):
+    """
+    Paginator that takes its total from a precomputed counter when given one
+    """
+
+    def __init__(self, object_list, per_page, precomputed_count=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.precomputed_count = precomputed_count
+
+    @cached_property
+    def count(self):
+        if self.precomputed_count is not None:
+            return self.precomputed_count
+        return super().count
+
+
+class CounterPaginationMixin:
+    """
+    Changelist pagination without COUNT(*) for the filters that have counters
+    """
+    show_full_result_count = False
+
+    def get_counter_name(self, filters):
+        return None
+
+    def get_paginator(self, request, queryset, per_page, orphans=0, allow_empty_first_page=True):
+        # Page number and ordering do not change the count
+        filters = {key: value for key, value in request.GET.items() if key not in ('p', 'o')}
+        name = self.get_counter_name(filters)
+        return CounterPaginator(
+            queryset, per_page, orphans=orphans, allow_empty_first_page=allow_empty_first_page,
+            precomputed_count=counters.get_counter(name) if name else None,
+        )
 
 
 @admin.register(Review)
-class ReviewAdmin(admin.ModelAdmin):
+class ReviewAdmin(CounterPaginationMixin, admin.ModelAdmin):
     list_display = ['id', 'user', 'text_preview', 'created_at']
     list_filter = ['created_at']
     search_fields = ['text', 'user__username']
@@ -11,18 +50,61 @@ class ReviewAdmin(admin.ModelAdmin):
     def text_preview(self, obj):
         return obj.text[:50] + "..." if len(obj.text) > 50 else obj.text
     text_preview.short_description = "Text Preview"
+    
+    def get_counter_name(self, filters):
+        return counters.TOTAL if not filters else None
 
 
 @admin.register(ModerationResult)
 class ModerationResultAdmin(admin.ModelAdmin):
-    list_display = ['id', 'review_id', 'flagged', 'is_spam', 'spam_probability', 'created_at']
-    list_filter = ['flagged', 'is_spam', 'created_at']
+    list_display = ['id', 'review_id', 'flagged', 'is_spam', 'spam_probability', 'policy', 'created_at']
+    list_filter = ['flagged', 'is_spam', 'policy', 'created_at']
     search_fields = ['review__text', 'review__user__username']
     readonly_fields = ['created_at']
 
 
+@admin.register(ModerationOverride)
+class ModerationOverrideAdmin(admin.ModelAdmin):
+    list_display = ['id', 'review_id', 'moderator', 'previous_flagged', 'flagged',
+                    'previous_is_spam', 'is_spam', 'created_at']
+    list_filter = ['flagged', 'is_spam', 'created_at']
+    search_fields = ['reason', 'moderator__username']
+    readonly_fields = ['created_at']
+
+
+@admin.register(Product)
+class ProductAdmin(admin.ModelAdmin):
+    list_display = ['id', 'name', 'review_count', 'visible_count', 'flagged_count', 'spam_count', 'created_at']
+    search_fields = ['name']
+    readonly_fields = ['created_at', 'review_count', 'visible_count', 'flagged_count', 'spam_count',
+                       'rating_1_count', 'rating_2_count', 'rating_3_count', 'rating_4_count', 'rating_5_count']
+
+
+@admin.register(ModerationFailure)
+class ModerationFailureAdmin(admin.ModelAdmin):
+    list_display = ['id', 'review_id', 'status', 'attempts', 'next_attempt_at', 'updated_at']
+    list_filter = ['status', 'updated_at']
+    search_fields = ['last_error', 'review__text']
+    readonly_fields = ['created_at', 'updated_at']
+
+
+@admin.register(ReviewEdit)
+class ReviewEditAdmin(admin.ModelAdmin):
+    list_display = ['id', 'review_id', 'change_ratio', 'remoderated', 'created_at']
+    list_filter = ['remoderated', 'created_at']
+    search_fields = ['text', 'previous_text']
+    readonly_fields = ['created_at']
+
+
+@admin.register(UserReputation)
+class UserReputationAdmin(admin.ModelAdmin):
+    list_display = ['user', 'checked_count', 'flagged_count', 'spam_count', 'updated_at']
+    search_fields = ['user__username']
+    readonly_fields = ['updated_at']
+
+
 @admin.register(AIServiceError)
-class AIServiceErrorAdmin(admin.ModelAdmin):
+class AIServiceErrorAdmin(CounterPaginationMixin, admin.ModelAdmin):
     list_display = ['id', 'service', 'error_preview', 'status_code', 'timestamp']
     list_filter = ['service', 'timestamp', 'status_code']
     search_fields = ['error_message', 'input_text']
@@ -42,3 +124,22 @@ class AIServiceErrorAdmin(admin.ModelAdmin):
     def error_preview(self, obj):
         return obj.error_message[:75] + "..." if len(obj.error_message) > 75 else obj.error_message
     error_preview.short_description = "Error Message Preview"
+    
+    def get_counter_name(self, filters):
+        if not filters:
+            return counters.ERRORS_TOTAL
+        if list(filters) == ['service__exact']:
+            return counters.errors_counter(filters['service__exact'])
+        return None
+
+
+@admin.register(ModerationCounter)
+class ModerationCounterAdmin(admin.ModelAdmin):
+    list_display = ['name', 'value']
+    readonly_fields = ['name', 'value']
+
+
+@admin.register(ModerationOutbox)
+class ModerationOutboxAdmin(admin.ModelAdmin):
+    list_display = ['id', 'review_id', 'attempts', 'created_at']
+    readonly_fields = ['created_at']
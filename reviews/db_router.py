@@ -0,0 +1,76 @@
+"""
+Database routing between the primary and read replicas
+"""
+import contextvars
+import logging
+import random
+from django.conf import settings
+from redis.exceptions import RedisError
+from .services.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+_use_replica = contextvars.ContextVar('use_replica', default=False)
+
+PIN_KEY = "replica:pin:{}"
+
+
+class ReplicaRouter:
+    """
+    Send reads to a random replica while a read-only view is being served,
+    everything else (writes, workers, read-after-write paths) stays on the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        if _use_replica.get() and settings.DATABASE_REPLICAS:
+            return random.choice(settings.DATABASE_REPLICAS)
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas mirror the primary, objects from any of them may be related
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return None
+
+
+def pin_to_primary(user_id):
+    """
+    Keep the user's reads on the primary for a few seconds after they wrote,
+    so they see their own changes before the replicas catch up.
+    """
+    try:
+        get_redis().set(PIN_KEY.format(user_id), 1, ex=settings.REPLICA_PIN_SECONDS)
+    except RedisError as e:
+        logger.warning(f"Failed to pin user {user_id} to the primary: {e}")
+
+
+def is_pinned_to_primary(user_id):
+    try:
+        return bool(get_redis().exists(PIN_KEY.format(user_id)))
+    except RedisError:
+        # Without Redis we cannot tell, the primary is always safe
+        return True
+
+
+class ReadReplicaMixin:
+    """
+    View mixin routing the reads of GET/HEAD requests to the read replicas,
+    unless the user recently wrote and is pinned to the primary.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if (settings.DATABASE_REPLICAS and request.method in ('GET', 'HEAD')
+                and not is_pinned_to_primary(request.user.id)):
+            self._replica_token = _use_replica.set(True)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, '_replica_token', None)
+        if token is not None:
+            _use_replica.reset(token)
+            self._replica_token = None
+        return super().finalize_response(request, response, *args, **kwargs)
@@ -0,0 +1,150 @@
+"""
+Structured, non-blocking logging for the moderation hot path
+"""
+import contextlib
+import contextvars
+import copy
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import weakref
+from logging.handlers import QueueListener
+
+_context = contextvars.ContextVar('log_context', default={})
+
+# Attributes every LogRecord has, anything else was passed as a field through extra
+RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'sampled'}
+
+
+@contextlib.contextmanager
+def log_context(**fields):
+    """
+    Attach fields such as the review ID to every record logged inside the block
+    """
+    token = _context.set({**_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+class ContextFilter(logging.Filter):
+    """
+    Copy the fields of the current log_context onto the record
+    """
+
+    def filter(self, record):
+        for name, value in _context.get().items():
+            if not hasattr(record, name):
+                setattr(record, name, value)
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Let through only a share of the records logged with extra={'sampled': True},
+    everything else always passes
+    """
+
+    def __init__(self, rate=1.0):
+        super().__init__()
+        self.rate = float(rate)
+
+    def filter(self, record):
+        if not getattr(record, 'sampled', False):
+            return True
+        return self.rate >= 1.0 or random.random() < self.rate
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per record, with the fields passed through extra as keys
+    """
+
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        entry.update({name: value for name, value in vars(record).items() if name not in RECORD_ATTRIBUTES})
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+# Handlers whose listener thread must be restarted in forked children
+_handlers = weakref.WeakSet()
+
+
+def _restart_after_fork():
+    for handler in list(_handlers):
+        handler.start()
+
+
+# Forked workers (Celery prefork) inherit the queue but not the thread draining it
+os.register_at_fork(after_in_child=_restart_after_fork)
+
+
+class NonBlockingHandler(logging.Handler):
+    """
+    Hand records to a bounded queue drained by a background thread, so the
+    caller never waits on the stream or file. Records are dropped when the queue is full.
+    Not a QueueHandler subclass: dictConfig passes QueueHandler subclasses a
+    queue as their first argument on Python 3.12+.
+    """
+
+    def __init__(self, stream=None, filename=None, queue_size=10000):
+        super().__init__()
+        if filename:
+            self.target = logging.FileHandler(filename, delay=True)
+        else:
+            self.target = logging.StreamHandler(stream or sys.stdout)
+        self.queue = queue.Queue(queue_size)
+        self.listener = None
+        self.dropped = 0
+        self.start()
+        _handlers.add(self)
+
+    def start(self):
+        self.queue = queue.Queue(self.queue.maxsize)
+        self.listener = QueueListener(self.queue, self.target)
+        self.listener.start()
+
+    def close(self):
+        # Called by logging.shutdown at exit, drains the queue before closing the target
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+        self.target.close()
+        _handlers.discard(self)
+        super().close()
+
+    def setFormatter(self, fmt):
+        # Formatting happens on the listener thread, not the caller's
+        super().setFormatter(fmt)
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        # Resolve only what cannot be handed to another thread
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def emit(self, record):
+        try:
+            self.queue.put_nowait(self.prepare(record))
+        except queue.Full:
+            self.dropped += 1
+        except Exception:
+            self.handleError(record)
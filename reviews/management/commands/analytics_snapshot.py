@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand, CommandError
+from reviews.services.analytics import run_snapshot
+
+
+class Command(BaseCommand):
+    help = "Write an incremental Parquet snapshot of reviews and moderation scores"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=None,
+                            help="Rows read and written per chunk")
+
+    def handle(self, *args, **options):
+        snapshot = run_snapshot(chunk_size=options['chunk_size'])
+        if snapshot.status == 'failed':
+            raise CommandError(f"Snapshot failed: {snapshot.error_message}")
+        if snapshot.row_count:
+            self.stdout.write(self.style.SUCCESS(f"Wrote {snapshot.row_count} rows to {snapshot.path}"))
+        else:
+            self.stdout.write("No new moderation results since the last snapshot")
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from reviews.services.retention import archive_ai_errors, archive_moderation_scores
+
+
+class Command(BaseCommand):
+    help = "Archive aged AI service errors and moderation scores to compressed JSONL files"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ai-error-days', type=int, default=None,
+                            help="Override the AI service error retention window")
+        parser.add_argument('--moderation-days', type=int, default=None,
+                            help="Override the moderation score retention window")
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help="Number of rows archived and deleted per batch")
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Only report how many rows would be archived")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        dry_run = options['dry_run']
+
+        archived, path = archive_ai_errors(options['ai_error_days'], batch_size, dry_run)
+        self._report("AI service errors", archived, path, dry_run)
+
+        archived, path = archive_moderation_scores(options['moderation_days'], batch_size, dry_run)
+        self._report("moderation score payloads", archived, path, dry_run)
+
+    def _report(self, label, archived, path, dry_run):
+        if dry_run:
+            self.stdout.write(f"{archived} {label} would be archived")
+        elif path:
+            self.stdout.write(self.style.SUCCESS(f"Archived {archived} {label} to {path}"))
+        else:
+            self.stdout.write(f"No {label} to archive")
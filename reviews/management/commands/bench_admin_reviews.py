@@ -0,0 +1,84 @@
+import random
+import time
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from rest_framework.renderers import JSONRenderer
+from reviews.models import Review, ModerationResult
+from reviews.serializers import AdminReviewWithModerationSerializer, serialize_admin_reviews
+
+CATEGORIES = ['harassment', 'hate', 'self-harm', 'sexual', 'violence']
+
+
+class Command(BaseCommand):
+    help = "Benchmark the admin review listing serializer against the values() fast path"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0,
+                            help="Create this many temporary reviews, rolled back afterwards")
+        parser.add_argument('--repeat', type=int, default=5,
+                            help="Number of timed runs per path")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if options['seed']:
+                self._seed(options['seed'])
+            self._run(options['repeat'])
+            transaction.set_rollback(True)
+
+    def _seed(self, count):
+        user = User.objects.create(username=f"bench-{time.time_ns()}")
+        reviews = Review.objects.bulk_create(
+            Review(user=user, text=f"Benchmark review {i} " * 10) for i in range(count)
+        )
+        # Leave a share of reviews unmoderated to cover the missing-result branch
+        ModerationResult.objects.bulk_create(
+            ModerationResult(
+                review=review,
+                flagged=random.random() < 0.2,
+                categories={cat: random.random() < 0.1 for cat in CATEGORIES},
+                category_scores={cat: random.random() / 1000 for cat in CATEGORIES},
+                is_spam=random.random() < 0.1,
+                spam_probability=random.random(),
+                non_spam_probability=random.random(),
+                moderated_text=review.text,
+            )
+            for review in reviews if random.random() < 0.8
+        )
+
+    def _run(self, repeat):
+        queryset = Review.objects.select_related('moderation_result').all()
+        renderer = JSONRenderer()
+
+        def serializer_path():
+            return renderer.render(AdminReviewWithModerationSerializer(queryset.all(), many=True).data)
+
+        def fast_path():
+            return renderer.render(serialize_admin_reviews(queryset.all()))
+
+        queries = []
+
+        def count_queries(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        results = {}
+        for name, path in [('serializer', serializer_path), ('values()', fast_path)]:
+            timings = []
+            for _ in range(repeat):
+                queries.clear()
+                with connection.execute_wrapper(count_queries):
+                    start = time.perf_counter()
+                    body = path()
+                    timings.append(time.perf_counter() - start)
+            results[name] = body
+            self.stdout.write(
+                f"{name:<12} best {min(timings) * 1000:8.2f} ms  "
+                f"mean {sum(timings) / len(timings) * 1000:8.2f} ms  "
+                f"queries {len(queries)}  bytes {len(body)}"
+            )
+
+        if results['serializer'] == results['values()']:
+            self.stdout.write(self.style.SUCCESS(f"Responses identical across {queryset.count()} reviews"))
+        else:
+            self.stdout.write(self.style.ERROR("Responses differ"))
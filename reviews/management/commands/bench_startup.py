@@ -0,0 +1,66 @@
+import statistics
+import subprocess
+import sys
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# Each snippet boots one entry point in a fresh interpreter and prints the seconds it took
+TARGETS = {
+    'wsgi': (
+        "from django.core.wsgi import get_wsgi_application\n"
+        "application = get_wsgi_application()\n"
+        "from django.urls import get_resolver\n"
+        "get_resolver().url_patterns\n"
+    ),
+    'asgi': (
+        "from django.core.asgi import get_asgi_application\n"
+        "application = get_asgi_application()\n"
+        "from django.urls import get_resolver\n"
+        "get_resolver().url_patterns\n"
+    ),
+    'celery': (
+        "from reviews_project.celery import app\n"
+        "app.loader.import_default_modules()\n"
+        "app.finalize()\n"
+    ),
+}
+
+SNIPPET = (
+    "import os, time\n"
+    "start = time.perf_counter()\n"
+    "os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'reviews_project.settings')\n"
+    "{body}"
+    "print(time.perf_counter() - start)\n"
+)
+
+
+class Command(BaseCommand):
+    help = "Benchmark the cold start of the WSGI and ASGI applications and the Celery worker"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5,
+                            help="Number of cold starts per entry point")
+        parser.add_argument('--target', choices=sorted(TARGETS), action='append',
+                            help="Entry point to benchmark, may be repeated (default: all)")
+
+    def handle(self, *args, **options):
+        for target in options['target'] or TARGETS:
+            boots, totals = [], []
+            for _ in range(options['repeat']):
+                start = time.perf_counter()
+                result = subprocess.run(
+                    [sys.executable, '-c', SNIPPET.format(body=TARGETS[target])],
+                    cwd=settings.BASE_DIR, capture_output=True, text=True,
+                )
+                totals.append(time.perf_counter() - start)
+                if result.returncode != 0:
+                    self.stdout.write(self.style.ERROR(f"{target} failed to start:\n{result.stderr}"))
+                    break
+                # The last line, the app may log before it
+                boots.append(float(result.stdout.strip().splitlines()[-1]))
+            else:
+                self.stdout.write(
+                    f"{target:<7} boot best {min(boots) * 1000:7.1f} ms  median {statistics.median(boots) * 1000:7.1f} ms  "
+                    f"process median {statistics.median(totals) * 1000:7.1f} ms"
+                )
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from reviews.services.tokens import prune_tokens
+
+
+class Command(BaseCommand):
+    help = "Move valid JWT blacklist entries to Redis and delete expired outstanding tokens"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help="Number of expired tokens deleted per batch")
+
+    def handle(self, *args, **options):
+        moved, deleted = prune_tokens(options['batch_size'])
+        self.stdout.write(f"Moved {moved} blacklist entries to Redis")
+        self.stdout.write(self.style.SUCCESS(f"Pruned {deleted} expired tokens"))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from reviews.services.counters import rebuild_counters
+from reviews.services.products import rebuild_product_stats
+
+
+class Command(BaseCommand):
+    help = "Recompute the precomputed review and AI service error counters and the product aggregates"
+
+    def handle(self, *args, **options):
+        for name, value in rebuild_counters().items():
+            self.stdout.write(f"{name} = {value}")
+        self.stdout.write(f"Rebuilt the aggregates of {rebuild_product_stats()} products")
+        self.stdout.write(self.style.SUCCESS("Counters rebuilt"))
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from reviews.services.reputation import rebuild_reputations
+
+
+class Command(BaseCommand):
+    help = "Recompute user reputation counters from stored moderation results"
+
+    def handle(self, *args, **options):
+        updated = rebuild_reputations()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt reputation for {updated} users"))
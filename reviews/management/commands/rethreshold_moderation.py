@@ -0,0 +1,39 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from reviews.services.rethreshold import rethreshold
+
+
+class Command(BaseCommand):
+    help = "Re-evaluate stored moderation scores against per-category thresholds without calling OpenAI"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--thresholds', type=str, default=None,
+                            help='JSON object of category thresholds, e.g. \'{"hate": 0.4}\' '
+                                 '(default: MODERATION_THRESHOLDS)')
+        parser.add_argument('--apply', action='store_true',
+                            help="Write the new verdicts, otherwise only report the diff")
+        parser.add_argument('--chunk-size', type=int, default=None,
+                            help="Moderation results evaluated per chunk")
+
+    def handle(self, *args, **options):
+        thresholds = None
+        if options['thresholds']:
+            try:
+                thresholds = {key: float(value) for key, value in json.loads(options['thresholds']).items()}
+            except (ValueError, AttributeError) as e:
+                raise CommandError(f"Invalid thresholds: {e}")
+        if thresholds is not None and not thresholds:
+            raise CommandError("Provide at least one category threshold")
+
+        summary = rethreshold(thresholds, apply=options['apply'], chunk_size=options['chunk_size'])
+
+        verb = "Changed" if options['apply'] else "Would change"
+        self.stdout.write(f"Evaluated {summary['evaluated']} results, skipped {summary['skipped']} without scores")
+        self.stdout.write(f"{verb}: {summary['newly_flagged']} newly flagged, "
+                          f"{summary['newly_unflagged']} newly unflagged, {summary['unchanged']} unchanged")
+        for category, count in sorted(summary['exceeded_by_category'].items()):
+            self.stdout.write(f"  {category}: {count} over threshold")
+        if options['apply']:
+            self.stdout.write(f"Wrote {summary['written']} verdicts, the rest changed meanwhile and were left alone")
+        if not options['apply']:
+            self.stdout.write("Dry run, re-run with --apply to write the new verdicts")
@@ -0,0 +1,31 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from reviews.services.outbox import relay_outbox_until_empty
+
+
+class Command(BaseCommand):
+    help = "Publish pending moderation outbox entries to Celery in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=settings.OUTBOX_RELAY_BATCH_SIZE,
+                            help="Number of entries published per batch")
+        parser.add_argument('--interval', type=float, default=settings.OUTBOX_RELAY_INTERVAL,
+                            help="Seconds to sleep between polls when the outbox is empty")
+        parser.add_argument('--once', action='store_true',
+                            help="Drain the outbox once and exit instead of polling")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        if options['once']:
+            published = relay_outbox_until_empty(batch_size)
+            self.stdout.write(self.style.SUCCESS(f"Published {published} outbox entries"))
+            return
+
+        self.stdout.write(f"Outbox relay running (batch size {batch_size}, interval {options['interval']}s)")
+        while True:
+            published = relay_outbox_until_empty(batch_size)
+            if published:
+                self.stdout.write(f"Published {published} outbox entries")
+            time.sleep(options['interval'])
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_aiserviceerror'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ModerationOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('review', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='outbox_entries', to='reviews.review')),
+            ],
+            options={
+                'verbose_name': 'Moderation Outbox Entry',
+                'verbose_name_plural': 'Moderation Outbox',
+                'ordering': ['id'],
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_moderationoutbox'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='aiserviceerror',
+            index=models.Index(fields=['service', '-timestamp'], name='aierror_service_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='aiserviceerror',
+            index=models.Index(fields=['-timestamp'], name='aierror_ts_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:24
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_aiserviceerror_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='moderationresult',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AlterField(
+            model_name='review',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+    ]
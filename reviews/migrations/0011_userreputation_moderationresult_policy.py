@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:24
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0010_review_user_created_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='moderationresult',
+            name='policy',
+            field=models.CharField(choices=[('full', 'Full Checks'), ('sampled', 'Sampled Checks'), ('trusted_skip', 'Skipped for Trusted User')], default='full', help_text='Moderation policy applied to the review', max_length=20),
+        ),
+        migrations.CreateModel(
+            name='UserReputation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('checked_count', models.IntegerField(default=0)),
+                ('flagged_count', models.IntegerField(default=0)),
+                ('spam_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='reputation', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:30
+
+from django.db import migrations, models
+from django.db.models import Q
+
+
+def seed_counters(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    ModerationResult = apps.get_model('reviews', 'ModerationResult')
+    AIServiceError = apps.get_model('reviews', 'AIServiceError')
+    ModerationCounter = apps.get_model('reviews', 'ModerationCounter')
+
+    unmoderated = Q(moderation_result__isnull=True)
+    counts = {
+        'reviews:total': Review.objects.count(),
+        'reviews:pending': Review.objects.filter(unmoderated).count(),
+        'reviews:flagged': ModerationResult.objects.filter(flagged=True).count(),
+        'reviews:spam': ModerationResult.objects.filter(is_spam=True).count(),
+        'reviews:visible': Review.objects.filter(
+            Q(moderation_result__flagged=False, moderation_result__is_spam=False) | unmoderated
+        ).count(),
+        'errors:total': AIServiceError.objects.count(),
+        'errors:moderation': AIServiceError.objects.filter(service='moderation').count(),
+        'errors:spam_detection': AIServiceError.objects.filter(service='spam_detection').count(),
+    }
+    ModerationCounter.objects.bulk_create(
+        ModerationCounter(name=name, value=value) for name, value in counts.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0011_userreputation_moderationresult_policy'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ModerationCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(seed_counters, migrations.RunPython.noop),
+    ]
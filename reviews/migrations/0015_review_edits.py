@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0014_analyticssnapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='edited_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='ReviewEdit',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('previous_text', models.TextField()),
+                ('text', models.TextField()),
+                ('change_ratio', models.FloatField(help_text="Share of the new text's tokens that were not in the previous text")),
+                ('remoderated', models.BooleanField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('review', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='edits', to='reviews.review')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0015_review_edits'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ModerationFailure',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('retrying', 'Retrying'), ('dead', 'Dead Letter')], db_index=True, default='retrying', max_length=20)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+                ('next_attempt_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('review', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='moderation_failure', to='reviews.review')),
+            ],
+            options={
+                'ordering': ['-updated_at'],
+            },
+        ),
+    ]
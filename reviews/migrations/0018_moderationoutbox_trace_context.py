@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0017_product'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='moderationoutbox',
+            name='trace_context',
+            field=models.JSONField(blank=True, help_text='Trace carried on to the moderation task', null=True),
+        ),
+    ]
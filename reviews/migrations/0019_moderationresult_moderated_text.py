@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:56
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_moderated_text(apps, schema_editor):
+    # Existing verdicts were given for the review's current text
+    Review = apps.get_model('reviews', 'Review')
+    ModerationResult = apps.get_model('reviews', 'ModerationResult')
+    ModerationResult.objects.update(
+        moderated_text=Subquery(Review.objects.filter(pk=OuterRef('review_id')).values('text')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0018_moderationoutbox_trace_context'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='moderationresult',
+            name='moderated_text',
+            field=models.TextField(blank=True, default='', help_text='Review text the verdict was given for'),
+        ),
+        migrations.AlterField(
+            model_name='reviewedit',
+            name='change_ratio',
+            field=models.FloatField(help_text="Share of the new text's tokens that were not in the last moderated text"),
+        ),
+        migrations.RunPython(backfill_moderated_text, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0019_moderationresult_moderated_text'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='moderationresult',
+            name='policy',
+            field=models.CharField(choices=[('full', 'Full Checks'), ('sampled', 'Sampled Checks'), ('trusted_skip', 'Skipped for Trusted User'), ('deferred', 'Checked After Skipping')], default='full', help_text='Moderation policy applied to the review', max_length=20),
+        ),
+    ]
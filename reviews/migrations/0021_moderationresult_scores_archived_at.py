@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0020_moderationresult_deferred_policy'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='moderationresult',
+            name='scores_archived_at',
+            field=models.DateTimeField(blank=True, help_text='When category_scores were moved to the archive', null=True),
+        ),
+    ]
@@ -1,10 +1,63 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.core.validators import MinValueValidator, MaxValueValidator
+
+RATING_CHOICES = range(1, 6)
+
+
+class Product(models.Model):
+    """
+    A reviewed product. Its review aggregates are updated incrementally
+    as reviews are written and moderated, so a product page reads one row.
+    Visible reviews include those still pending moderation, the rating
+    histogram counts visible reviews only.
+    """
+    name = models.CharField(max_length=200)
+    description = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    review_count = models.IntegerField(default=0)
+    visible_count = models.IntegerField(default=0)
+    flagged_count = models.IntegerField(default=0)
+    spam_count = models.IntegerField(default=0)
+    rating_1_count = models.IntegerField(default=0)
+    rating_2_count = models.IntegerField(default=0)
+    rating_3_count = models.IntegerField(default=0)
+    rating_4_count = models.IntegerField(default=0)
+    rating_5_count = models.IntegerField(default=0)
+
+    @property
+    def rating_histogram(self):
+        return {rating: getattr(self, f'rating_{rating}_count') for rating in RATING_CHOICES}
+
+    @property
+    def average_rating(self):
+        histogram = self.rating_histogram
+        rated = sum(histogram.values())
+        if not rated:
+            return None
+        return sum(rating * count for rating, count in histogram.items()) / rated
+
+    def __str__(self):
+        return self.name
+
 
 class Review(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='reviews')
+    # Indexed by the (product, -created_at) index below
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='reviews',
+                                null=True, blank=True, db_index=False)
+    rating = models.PositiveSmallIntegerField(null=True, blank=True,
+                                              validators=[MinValueValidator(1), MaxValueValidator(5)])
     text = models.TextField()
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    edited_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='review_user_created_idx'),
+            models.Index(fields=['product', '-created_at'], name='review_product_created_idx'),
+        ]
 
     def __str__(self):
         return f"Review by {self.user.username} at {self.created_at}"
@@ -12,6 +65,13 @@ class Review(models.Model):
 
 
 class ModerationResult(models.Model):
+    POLICY_CHOICES = [
+        ('full', 'Full Checks'),
+        ('sampled', 'Sampled Checks'),
+        ('trusted_skip', 'Skipped for Trusted User'),
+        ('deferred', 'Checked After Skipping'),
+    ]
+
     review = models.OneToOneField(Review, on_delete=models.CASCADE, related_name='moderation_result')
     flagged = models.BooleanField()
     categories = models.JSONField()
@@ -21,12 +81,49 @@ class ModerationResult(models.Model):
     spam_probability = models.FloatField(default=0.0)
     non_spam_probability = models.FloatField(default=1.0)
     
+    policy = models.CharField(max_length=20, choices=POLICY_CHOICES, default='full',
+                              help_text="Moderation policy applied to the review")
+    moderated_text = models.TextField(blank=True, default='',
+                                      help_text="Review text the verdict was given for")
+    scores_archived_at = models.DateTimeField(null=True, blank=True,
+                                              help_text="When category_scores were moved to the archive")
+    
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    @property
+    def status(self):
+        if self.flagged:
+            return 'flagged'
+        if self.is_spam:
+            return 'spam'
+        return 'approved'
 
     def __str__(self):
         return f"Moderation for Review {self.review.id} – Flagged: {self.flagged}, Spam: {self.is_spam}"
 
 
+class UserReputation(models.Model):
+    """
+    Running counts of a user's moderation outcomes, updated incrementally
+    whenever a review is checked by the external services
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='reputation')
+    checked_count = models.IntegerField(default=0)
+    flagged_count = models.IntegerField(default=0)
+    spam_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def bad_ratio(self):
+        if not self.checked_count:
+            return 0.0
+        return (self.flagged_count + self.spam_count) / self.checked_count
+
+    def __str__(self):
+        return f"Reputation of {self.user.username} – {self.checked_count} checked, {self.bad_ratio:.2%} bad"
+
+
 class AIServiceError(models.Model):
     """
     Model to log errors from external AI services (moderation, spam detection)
@@ -45,8 +142,163 @@ class AIServiceError(models.Model):
     
     class Meta:
         ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['service', '-timestamp'], name='aierror_service_ts_idx'),
+            models.Index(fields=['-timestamp'], name='aierror_ts_idx'),
+        ]
         verbose_name = "AI Service Error"
         verbose_name_plural = "AI Service Errors"
     
     def __str__(self):
-        return f"{self.get_service_display()} Error at {self.timestamp.strftime('%Y-%m-%d %H:%M:%S')}"
\ No newline at end of file
+        return f"{self.get_service_display()} Error at {self.timestamp.strftime('%Y-%m-%d %H:%M:%S')}"
+
+class ReviewEdit(models.Model):
+    """
+    Edit history of a review, with how much the text changed
+    and whether the edit was moderated again
+    """
+    review = models.ForeignKey(Review, on_delete=models.CASCADE, related_name='edits')
+    previous_text = models.TextField()
+    text = models.TextField()
+    change_ratio = models.FloatField(help_text="Share of the new text's tokens that were not in the last moderated text")
+    remoderated = models.BooleanField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Edit of Review {self.review_id} at {self.created_at} – Remoderated: {self.remoderated}"
+
+
+class ModerationFailure(models.Model):
+    """
+    A review whose moderation failed because an external service was unavailable.
+    It is retried with backoff and becomes a dead letter after too many attempts.
+    """
+
+    STATUS_CHOICES = [
+        ('retrying', 'Retrying'),
+        ('dead', 'Dead Letter'),
+    ]
+
+    review = models.OneToOneField(Review, on_delete=models.CASCADE, related_name='moderation_failure')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='retrying', db_index=True)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    next_attempt_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-updated_at']
+
+    def __str__(self):
+        return f"Moderation failure of Review {self.review_id} – {self.status} after {self.attempts} attempts"
+
+
+class ModerationOutbox(models.Model):
+    """
+    Pending moderation dispatches, written in the same transaction as the review
+    and published to Celery by the outbox relay
+    """
+    review = models.ForeignKey(Review, on_delete=models.CASCADE, related_name='outbox_entries')
+    attempts = models.PositiveIntegerField(default=0)
+    trace_context = models.JSONField(null=True, blank=True, help_text="Trace carried on to the moderation task")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['id']
+        verbose_name = "Moderation Outbox Entry"
+        verbose_name_plural = "Moderation Outbox"
+
+    def __str__(self):
+        return f"Outbox entry for Review {self.review_id} (attempts: {self.attempts})"
+
+
+class UserDeletionJob(models.Model):
+    """
+    Background deletion of a user and their reviews, processed in batches
+    """
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+
+    user_id = models.IntegerField(db_index=True, help_text="ID of the user being deleted")
+    username = models.CharField(max_length=150)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    reviews_total = models.IntegerField(default=0)
+    reviews_deleted = models.IntegerField(default=0)
+    error_message = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Deletion of {self.username} – {self.get_status_display()} ({self.reviews_deleted}/{self.reviews_total})"
+
+
+class ModerationCounter(models.Model):
+    """
+    Precomputed row counts for common list filters, kept up to date by signals
+    so list endpoints and admin changelists can skip COUNT(*)
+    """
+    name = models.CharField(max_length=50, unique=True)
+    value = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name} = {self.value}"
+
+
+class ModerationOverride(models.Model):
+    """
+    Audit trail of moderator corrections to moderation verdicts
+    """
+    review = models.ForeignKey(Review, on_delete=models.CASCADE, related_name='moderation_overrides')
+    moderator = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='moderation_overrides')
+    previous_flagged = models.BooleanField()
+    previous_is_spam = models.BooleanField()
+    flagged = models.BooleanField()
+    is_spam = models.BooleanField()
+    reason = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Override of Review {self.review_id} by {self.moderator} at {self.created_at}"
+
+
+class AnalyticsSnapshot(models.Model):
+    """
+    One incremental columnar export of reviews and moderation scores,
+    the watermark marks the last moderation result it contains
+    """
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    path = models.CharField(max_length=500, blank=True)
+    row_count = models.IntegerField(default=0)
+    watermark_updated_at = models.DateTimeField(null=True, blank=True)
+    watermark_id = models.BigIntegerField(null=True, blank=True)
+    error_message = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Snapshot {self.id} – {self.get_status_display()} ({self.row_count} rows)"
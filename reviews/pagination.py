@@ -0,0 +1,41 @@
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+
+
+class UserCursorPagination(CursorPagination):
+    """
+    Cursor pagination over users by primary key
+    """
+    ordering = 'id'
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+
+class ReviewFeedCursorPagination(CursorPagination):
+    """
+    Keyset pagination over a review feed, newest first
+    """
+    ordering = ('-created_at', '-id')
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class CountedLimitOffsetPagination(LimitOffsetPagination):
+    """
+    Opt-in limit/offset pagination, lists stay unpaginated without ?limit=
+    The total comes from the view's precomputed counter when it has one
+    and falls back to COUNT(*) otherwise
+    """
+    max_limit = 500
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.view = view
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_count(self, queryset):
+        get_precomputed_count = getattr(self.view, 'get_precomputed_count', None)
+        count = get_precomputed_count() if get_precomputed_count else None
+        if count is not None:
+            return count
+        return super().get_count(queryset)
@@ -1,7 +1,11 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate
-from reviews.models import Review, ModerationResult, AIServiceError
+from rest_framework_simplejwt import serializers as jwt_serializers
+from reviews.tokens import RedisRefreshToken
+from reviews.services.tokens import record_login
+from reviews.models import (Product, Review, ReviewEdit, ModerationResult, ModerationFailure, AIServiceError,
+                            UserDeletionJob, AnalyticsSnapshot)
 
 class RegisterSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True)
@@ -32,12 +36,70 @@ class LoginSerializer(serializers.Serializer):
     
 
 
+class ProductSerializer(serializers.ModelSerializer):
+    """
+    Product with its denormalized review aggregates
+    """
+    rating_histogram = serializers.DictField(child=serializers.IntegerField(), read_only=True)
+    average_rating = serializers.FloatField(read_only=True, allow_null=True)
+    
+    class Meta:
+        model = Product
+        fields = ['id', 'name', 'description', 'created_at', 'review_count', 'visible_count',
+                 'flagged_count', 'spam_count', 'rating_histogram', 'average_rating']
+        read_only_fields = ['id', 'created_at', 'review_count', 'visible_count', 'flagged_count', 'spam_count']
+
+
+class TokenObtainPairSerializer(jwt_serializers.TokenObtainPairSerializer):
+    """
+    Token pair without database bookkeeping, last_login is updated in the background
+    """
+    token_class = RedisRefreshToken
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        record_login(self.user)
+        return data
+
+
+class TokenRefreshSerializer(jwt_serializers.TokenRefreshSerializer):
+    token_class = RedisRefreshToken
+
+
+class TokenBlacklistSerializer(jwt_serializers.TokenBlacklistSerializer):
+    token_class = RedisRefreshToken
+
+
 class ReviewSerializer(serializers.ModelSerializer):
     user = serializers.StringRelatedField(read_only=True)
     
     class Meta:
         model = Review
-        fields = ['id', 'user', 'text', 'created_at']
+        fields = ['id', 'user', 'product', 'rating', 'text', 'created_at', 'edited_at']
+
+
+class ReviewFeedSerializer(serializers.ModelSerializer):
+    """
+    Review with its moderation status, read from annotations joined in the feed query
+    """
+    is_flagged = serializers.BooleanField(source='moderation_flagged', read_only=True, allow_null=True)
+    is_spam = serializers.BooleanField(source='moderation_spam', read_only=True, allow_null=True)
+    moderation_status = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = Review
+        fields = ['id', 'product', 'rating', 'text', 'created_at', 'edited_at',
+                 'moderation_status', 'is_flagged', 'is_spam']
+    
+    def get_moderation_status(self, obj):
+        """Return 'pending', 'flagged', 'spam' or 'approved'"""
+        if obj.moderation_flagged is None:
+            return 'pending'
+        if obj.moderation_flagged:
+            return 'flagged'
+        if obj.moderation_spam:
+            return 'spam'
+        return 'approved'
 
 
 class ReviewCreateSerializer(serializers.ModelSerializer):
@@ -45,15 +107,39 @@ class ReviewCreateSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Review
-        fields = ['id', 'user', 'text', 'created_at']
-        read_only_fields = ['id', 'user', 'created_at']
+        fields = ['id', 'user', 'product', 'rating', 'text', 'created_at', 'edited_at']
+        read_only_fields = ['id', 'user', 'created_at', 'edited_at']
+
+
+class ReviewUpdateSerializer(ReviewCreateSerializer):
+    """
+    Edit of a review, only its text can change after posting
+    """
+    class Meta(ReviewCreateSerializer.Meta):
+        read_only_fields = ReviewCreateSerializer.Meta.read_only_fields + ['product', 'rating']
+
+    def validate(self, attrs):
+        # Read-only fields are ignored silently, reject them instead of answering 200 for nothing
+        fixed = sorted(set(self.initial_data) & {'product', 'rating'})
+        if fixed:
+            raise serializers.ValidationError({name: "Cannot be changed after posting" for name in fixed})
+        return attrs
+
+
+class ReviewEditSerializer(serializers.ModelSerializer):
+    """
+    One entry of a review's edit history
+    """
+    class Meta:
+        model = ReviewEdit
+        fields = ['id', 'previous_text', 'text', 'change_ratio', 'remoderated', 'created_at']
 
 
 class ModerationResultSerializer(serializers.ModelSerializer):
     class Meta:
         model = ModerationResult
         fields = ['flagged', 'categories', 'category_scores', 'is_spam', 
-                 'spam_probability', 'non_spam_probability', 'created_at']
+                 'spam_probability', 'non_spam_probability', 'policy', 'created_at']
 
 
 class AIServiceErrorSerializer(serializers.ModelSerializer):
@@ -70,6 +156,77 @@ class AIServiceErrorSerializer(serializers.ModelSerializer):
         return obj.input_text[:100] + "..." if len(obj.input_text) > 100 else obj.input_text
 
 
+class UserDeletionJobSerializer(serializers.ModelSerializer):
+    progress = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = UserDeletionJob
+        fields = ['id', 'user_id', 'username', 'status', 'reviews_total', 'reviews_deleted',
+                 'progress', 'error_message', 'created_at', 'finished_at']
+    
+    def get_progress(self, obj):
+        """Return the share of reviews deleted so far, between 0 and 1"""
+        if obj.status == 'completed':
+            return 1.0
+        return obj.reviews_deleted / obj.reviews_total if obj.reviews_total else 0.0
+
+
+class AnalyticsSnapshotSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = AnalyticsSnapshot
+        fields = ['id', 'status', 'path', 'row_count', 'watermark_updated_at', 'watermark_id',
+                 'error_message', 'created_at', 'finished_at']
+        read_only_fields = fields
+
+
+class ModerationFailureSerializer(serializers.ModelSerializer):
+    review_text = serializers.CharField(source='review.text', read_only=True)
+    
+    class Meta:
+        model = ModerationFailure
+        fields = ['id', 'review', 'review_text', 'status', 'attempts', 'last_error',
+                 'next_attempt_at', 'created_at', 'updated_at']
+        read_only_fields = fields
+
+
+class RequeueModerationFailuresSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False,
+                                allow_empty=False, max_length=10000)
+    all = serializers.BooleanField(required=False, default=False)
+    
+    def validate(self, attrs):
+        if ('ids' in attrs) == attrs['all']:
+            raise serializers.ValidationError('Provide either ids or all=true')
+        return attrs
+
+
+class ModerationOverrideFilterSerializer(serializers.Serializer):
+    flagged = serializers.BooleanField(required=False)
+    spam = serializers.BooleanField(required=False)
+    user_id = serializers.IntegerField(required=False)
+    created_after = serializers.DateTimeField(required=False)
+    created_before = serializers.DateTimeField(required=False)
+    min_spam_probability = serializers.FloatField(required=False, min_value=0.0, max_value=1.0)
+
+
+class BulkModerationOverrideSerializer(serializers.Serializer):
+    review_ids = serializers.ListField(child=serializers.IntegerField(), required=False,
+                                       allow_empty=False, max_length=10000)
+    filter = ModerationOverrideFilterSerializer(required=False)
+    flagged = serializers.BooleanField(required=False)
+    is_spam = serializers.BooleanField(required=False)
+    reason = serializers.CharField(required=False, allow_blank=True, default='')
+    
+    def validate(self, attrs):
+        if ('review_ids' in attrs) == ('filter' in attrs):
+            raise serializers.ValidationError('Provide either review_ids or filter')
+        if 'filter' in attrs and not attrs['filter']:
+            raise serializers.ValidationError('filter must contain at least one condition')
+        if 'flagged' not in attrs and 'is_spam' not in attrs:
+            raise serializers.ValidationError('Provide flagged and/or is_spam to override')
+        return attrs
+
+
 class AdminReviewWithModerationSerializer(serializers.ModelSerializer):
     user = serializers.StringRelatedField(read_only=True)
     moderation_result = ModerationResultSerializer(read_only=True)
@@ -100,4 +257,73 @@ class AdminReviewWithModerationSerializer(serializers.ModelSerializer):
     
     def get_spam_confidence(self, obj):
         """Return spam detection confidence score"""
-        return obj.moderation_result.spam_probability if hasattr(obj, 'moderation_result') else 0.0
\ No newline at end of file
+        return obj.moderation_result.spam_probability if hasattr(obj, 'moderation_result') else 0.0
+
+ADMIN_REVIEW_VALUE_FIELDS = [
+    'id', 'user__username', 'text', 'created_at',
+    'moderation_result__id', 'moderation_result__flagged', 'moderation_result__categories',
+    'moderation_result__category_scores', 'moderation_result__is_spam',
+    'moderation_result__spam_probability', 'moderation_result__non_spam_probability',
+    'moderation_result__policy', 'moderation_result__created_at',
+]
+
+_datetime_field = serializers.DateTimeField()
+
+
+def admin_review_rows(queryset):
+    """
+    Flat values() rows for the admin review fast path, fetched in a single query
+    """
+    return queryset.values(*ADMIN_REVIEW_VALUE_FIELDS)
+
+
+def serialize_admin_reviews(queryset):
+    """
+    Fast read path equivalent to AdminReviewWithModerationSerializer(many=True).
+    Builds plain dicts from flat values() rows instead of model instances,
+    the rendered JSON is byte-for-byte identical to the serializer output.
+    """
+    return serialize_admin_review_rows(admin_review_rows(queryset))
+
+
+def serialize_admin_review_rows(rows):
+    """
+    Build admin review payloads from rows returned by admin_review_rows
+    """
+    data = []
+    for row in rows:
+        if row['moderation_result__id'] is None:
+            moderation_result = None
+            is_flagged = False
+            flagged_categories = []
+            is_spam = False
+            spam_confidence = 0.0
+        else:
+            is_flagged = row['moderation_result__flagged']
+            is_spam = row['moderation_result__is_spam']
+            spam_confidence = row['moderation_result__spam_probability']
+            categories = row['moderation_result__categories']
+            flagged_categories = [cat for cat, flagged in categories.items() if flagged] if is_flagged else []
+            moderation_result = {
+                'flagged': is_flagged,
+                'categories': categories,
+                'category_scores': row['moderation_result__category_scores'],
+                'is_spam': is_spam,
+                'spam_probability': float(spam_confidence),
+                'non_spam_probability': float(row['moderation_result__non_spam_probability']),
+                'policy': row['moderation_result__policy'],
+                'created_at': _datetime_field.to_representation(row['moderation_result__created_at']),
+            }
+
+        data.append({
+            'id': row['id'],
+            'user': row['user__username'],
+            'text': row['text'],
+            'created_at': _datetime_field.to_representation(row['created_at']),
+            'moderation_result': moderation_result,
+            'is_flagged': is_flagged,
+            'flagged_categories': flagged_categories,
+            'is_spam': is_spam,
+            'spam_confidence': spam_confidence,
+        })
+    return data
@@ -0,0 +1,168 @@
+import logging
+from datetime import timedelta
+from pathlib import Path
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from reviews.models import ModerationResult, AnalyticsSnapshot
+
+logger = logging.getLogger(__name__)
+
+# OpenAI moderation categories, each becomes a typed float column
+SCORE_CATEGORIES = [
+    'harassment', 'harassment/threatening', 'hate', 'hate/threatening',
+    'illicit', 'illicit/violent', 'self-harm', 'self-harm/intent',
+    'self-harm/instructions', 'sexual', 'sexual/minors', 'violence',
+    'violence/graphic',
+]
+
+SNAPSHOT_FIELDS = [
+    'id', 'review_id', 'review__user_id', 'review__text', 'review__created_at',
+    'flagged', 'is_spam', 'spam_probability', 'non_spam_probability', 'policy',
+    'category_scores', 'updated_at',
+]
+
+
+def score_column(category):
+    return "score_" + category.replace('/', '_').replace('-', '_')
+
+
+def snapshot_schema():
+    import pyarrow as pa
+
+    fields = [
+        pa.field('review_id', pa.int64()),
+        pa.field('user_id', pa.int64()),
+        pa.field('text', pa.string()),
+        pa.field('review_created_at', pa.timestamp('us', tz='UTC')),
+        pa.field('flagged', pa.bool_()),
+        pa.field('is_spam', pa.bool_()),
+        pa.field('spam_probability', pa.float64()),
+        pa.field('non_spam_probability', pa.float64()),
+        pa.field('policy', pa.string()),
+        pa.field('moderated_at', pa.timestamp('us', tz='UTC')),
+    ]
+    fields += [pa.field(score_column(category), pa.float64()) for category in SCORE_CATEGORIES]
+    return pa.schema(fields)
+
+
+def rows_to_batch(rows, schema):
+    """
+    Turn a chunk of values() rows into an Arrow record batch
+    """
+    import pyarrow as pa
+
+    columns = {
+        'review_id': [row['review_id'] for row in rows],
+        'user_id': [row['review__user_id'] for row in rows],
+        'text': [row['review__text'] for row in rows],
+        'review_created_at': [row['review__created_at'] for row in rows],
+        'flagged': [row['flagged'] for row in rows],
+        'is_spam': [row['is_spam'] for row in rows],
+        'spam_probability': [row['spam_probability'] for row in rows],
+        'non_spam_probability': [row['non_spam_probability'] for row in rows],
+        'policy': [row['policy'] for row in rows],
+        'moderated_at': [row['updated_at'] for row in rows],
+    }
+    for category in SCORE_CATEGORIES:
+        columns[score_column(category)] = [
+            _as_float((row['category_scores'] or {}).get(category)) for row in rows
+        ]
+    return pa.RecordBatch.from_pydict(columns, schema=schema)
+
+
+def _as_float(value):
+    return float(value) if isinstance(value, (int, float)) else None
+
+
+def last_watermark():
+    """
+    (updated_at, id) of the newest moderation result already exported
+    """
+    previous = AnalyticsSnapshot.objects.filter(
+        status='completed', watermark_id__isnull=False
+    ).order_by('-watermark_updated_at', '-watermark_id').first()
+    if previous is None:
+        return None, None
+    return previous.watermark_updated_at, previous.watermark_id
+
+
+def write_snapshot(snapshot, chunk_size=None):
+    """
+    Export moderation results changed since the last snapshot into a new
+    Parquet file, reading and writing chunk by chunk so memory stays bounded.
+    Re-moderated or overridden reviews appear again in later snapshots,
+    readers keep the row with the latest moderated_at per review_id.
+    """
+    import pyarrow.parquet as pq
+
+    chunk_size = chunk_size or settings.ANALYTICS_SNAPSHOT_CHUNK_SIZE
+    watermark_updated_at, watermark_id = last_watermark()
+
+    # Rows younger than the lag may belong to transactions that have not committed yet,
+    # exporting past them would let those rows slip under the watermark for good
+    cutoff = timezone.now() - timedelta(seconds=settings.ANALYTICS_SNAPSHOT_LAG)
+    queryset = ModerationResult.objects.filter(updated_at__lt=cutoff).order_by('updated_at', 'id')
+    if watermark_updated_at is not None:
+        queryset = queryset.filter(
+            Q(updated_at__gt=watermark_updated_at)
+            | Q(updated_at=watermark_updated_at, id__gt=watermark_id)
+        )
+
+    snapshot_dir = Path(settings.ANALYTICS_SNAPSHOT_DIR)
+    snapshot_dir.mkdir(parents=True, exist_ok=True)
+    path = snapshot_dir / f"reviews-{timezone.now().strftime('%Y%m%dT%H%M%S')}-{snapshot.id}.parquet"
+    schema = snapshot_schema()
+
+    writer = None
+    last_row = None
+    try:
+        while True:
+            chunk = queryset
+            if last_row is not None:
+                # Keyset pagination over (updated_at, id)
+                chunk = chunk.filter(
+                    Q(updated_at__gt=last_row['updated_at'])
+                    | Q(updated_at=last_row['updated_at'], id__gt=last_row['id'])
+                )
+            rows = list(chunk.values(*SNAPSHOT_FIELDS)[:chunk_size])
+            if not rows:
+                break
+            if writer is None:
+                writer = pq.ParquetWriter(path, schema, compression='zstd')
+            writer.write_batch(rows_to_batch(rows, schema))
+            snapshot.row_count += len(rows)
+            last_row = rows[-1]
+    except Exception:
+        if writer is not None:
+            writer.close()
+            path.unlink(missing_ok=True)
+        raise
+    if writer is not None:
+        writer.close()
+
+    if last_row is not None:
+        snapshot.path = str(path)
+        snapshot.watermark_updated_at = last_row['updated_at']
+        snapshot.watermark_id = last_row['id']
+    snapshot.status = 'completed'
+    snapshot.finished_at = timezone.now()
+    snapshot.save()
+    logger.info(f"Analytics snapshot {snapshot.id} wrote {snapshot.row_count} rows to {snapshot.path or 'nothing'}")
+    return snapshot
+
+
+def run_snapshot(snapshot=None, chunk_size=None):
+    """
+    Create (if needed) and write a snapshot, recording failures on the row
+    """
+    snapshot = snapshot or AnalyticsSnapshot.objects.create()
+    try:
+        return write_snapshot(snapshot, chunk_size)
+    except Exception as e:
+        logger.error(f"Analytics snapshot {snapshot.id} failed: {e}")
+        snapshot.status = 'failed'
+        snapshot.error_message = str(e)
+        snapshot.finished_at = timezone.now()
+        snapshot.save(update_fields=['status', 'error_message', 'finished_at'])
+        return snapshot
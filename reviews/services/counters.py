@@ -0,0 +1,125 @@
+from django.db.models import F, Q
+from reviews.models import Review, ModerationResult, AIServiceError, ModerationCounter
+
+TOTAL = 'reviews:total'
+VISIBLE = 'reviews:visible'
+PENDING = 'reviews:pending'
+FLAGGED = 'reviews:flagged'
+SPAM = 'reviews:spam'
+ERRORS_TOTAL = 'errors:total'
+
+
+def errors_counter(service):
+    return f"errors:{service}"
+
+
+def bump(deltas):
+    """
+    Apply counter deltas, creating missing counters on first use.
+    Runs inside the caller's transaction so counts roll back with the write.
+    Counters are updated in name order, so concurrent writers lock the hot
+    rows in the same order and cannot deadlock each other.
+    """
+    for name in sorted(deltas):
+        delta = deltas[name]
+        if not delta:
+            continue
+        updated = ModerationCounter.objects.filter(name=name).update(value=F('value') + delta)
+        if not updated:
+            counter, _ = ModerationCounter.objects.get_or_create(name=name)
+            ModerationCounter.objects.filter(pk=counter.pk).update(value=F('value') + delta)
+
+
+def get_counter(name):
+    """
+    Return the counter's value, or None if it was never initialised.
+    """
+    return ModerationCounter.objects.filter(name=name).values_list('value', flat=True).first()
+
+
+def review_contribution(flagged=None, is_spam=None):
+    """
+    How one review counts towards the review counters,
+    flagged and is_spam are None while it has no moderation result
+    """
+    if flagged is None:
+        return {PENDING: 1, VISIBLE: 1}
+    return {
+        FLAGGED: int(flagged),
+        SPAM: int(is_spam),
+        VISIBLE: int(not flagged and not is_spam),
+    }
+
+
+def transition(before, after):
+    """
+    Counter deltas for a review moving from one contribution to another
+    """
+    names = sorted(set(before) | set(after))
+    return {name: after.get(name, 0) - before.get(name, 0) for name in names}
+
+
+def compute_counts():
+    """
+    Count every counter from scratch.
+    """
+    unmoderated = Q(moderation_result__isnull=True)
+    counts = {
+        TOTAL: Review.objects.count(),
+        PENDING: Review.objects.filter(unmoderated).count(),
+        FLAGGED: ModerationResult.objects.filter(flagged=True).count(),
+        SPAM: ModerationResult.objects.filter(is_spam=True).count(),
+        VISIBLE: Review.objects.filter(
+            Q(moderation_result__flagged=False, moderation_result__is_spam=False) | unmoderated
+        ).count(),
+        ERRORS_TOTAL: AIServiceError.objects.count(),
+    }
+    for service, _ in AIServiceError.SERVICE_CHOICES:
+        counts[errors_counter(service)] = AIServiceError.objects.filter(service=service).count()
+    return counts
+
+
+def rebuild_counters():
+    """
+    Recompute all counters, for use after bulk updates that bypass signals
+    or to repair drift. Returns the new values.
+    """
+    counts = compute_counts()
+    for name, value in counts.items():
+        ModerationCounter.objects.update_or_create(name=name, defaults={'value': value})
+    return counts
+
+
+def admin_review_counter(flagged=None, spam=None):
+    """
+    Counter answering the admin review filters, None when no counter matches
+    flagged and spam are the 'true'/'false' query values or None when absent
+    Returns (counter_name, subtract_from_total)
+    """
+    combinations = {
+        (None, None): (TOTAL, False),
+        ('true', None): (FLAGGED, False),
+        (None, 'true'): (SPAM, False),
+        ('false', None): (FLAGGED, True),
+        (None, 'false'): (SPAM, True),
+        ('false', 'false'): (VISIBLE, False),
+    }
+    return combinations.get((flagged, spam))
+
+
+def count_admin_reviews(flagged=None, spam=None):
+    """
+    Number of reviews matching the admin filters read from the counters,
+    or None when the filter combination is not precomputed
+    """
+    match = admin_review_counter(flagged, spam)
+    if match is None:
+        return None
+    name, subtract_from_total = match
+    value = get_counter(name)
+    if value is None:
+        return None
+    if subtract_from_total:
+        total = get_counter(TOTAL)
+        return None if total is None else total - value
+    return value
@@ -0,0 +1,53 @@
+import logging
+from django.conf import settings
+from django.db import transaction
+from reviews.models import ModerationResult
+from .locks import moderation_lock
+from .moderation import moderate_review, save_moderation_result
+from .reputation import record_moderation_outcome
+from .retries import needs_retry
+
+logger = logging.getLogger(__name__)
+
+
+def run_deferred_checks(batch_size=None):
+    """
+    Run the external checks skipped for trusted authors, oldest first, so a
+    compromised trusted account is caught late rather than never.
+    A review stays skipped and is checked on a later run while an external
+    service is failing. Returns the number of reviews checked.
+    """
+    batch_size = batch_size or settings.MODERATION_TRUST_POLICY['deferred_batch_size']
+    pending = (
+        ModerationResult.objects.filter(policy='trusted_skip')
+        # A moderator's verdict stands, as in rethreshold
+        .exclude(review__moderation_overrides__isnull=False)
+        .select_related('review').order_by('id')[:batch_size]
+    )
+    checked = 0
+    for moderation_result in pending:
+        review = moderation_result.review
+        with moderation_lock(review.id) as acquired:
+            if not acquired:
+                # Being moderated again after an edit
+                continue
+            still_skipped = ModerationResult.objects.filter(pk=moderation_result.pk, policy='trusted_skip').exclude(
+                review__moderation_overrides__isnull=False
+            ).exists()
+            if not still_skipped:
+                # Edited and moderated again, or overridden, since it was selected
+                continue
+            review.refresh_from_db()
+            result = moderate_review(review.text, user_id=review.user_id, trust=False)
+            if needs_retry(result):
+                logger.warning(f"Deferred checks paused after review {review.id}: {result['errors']}")
+                break
+            result['policy'] = 'deferred'
+            with transaction.atomic():
+                saved = save_moderation_result(review, result)
+                # Now checked, so it counts towards the author's reputation
+                record_moderation_outcome(review.user_id, saved.flagged, saved.is_spam)
+        checked += 1
+    if checked:
+        logger.info(f"Deferred checks ran for {checked} reviews skipped for trusted authors")
+    return checked
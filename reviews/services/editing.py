@@ -0,0 +1,86 @@
+import re
+from collections import Counter
+from django.conf import settings
+from django.db import transaction
+from reviews.models import Review, ReviewEdit, ModerationResult
+from .moderation import LINK_PATTERN
+from .outbox import enqueue_moderation
+from .reputation import adjust_reputations
+
+TOKEN_PATTERN = re.compile(r'\w+')
+
+
+def change_ratio(previous_text, text):
+    """
+    Share of the new text's tokens that were not in the previous text,
+    0.0 for a pure rewording or deletion and 1.0 for an entirely new text
+    """
+    previous_tokens = Counter(TOKEN_PATTERN.findall(previous_text.lower()))
+    tokens = Counter(TOKEN_PATTERN.findall(text.lower()))
+    total = sum(tokens.values())
+    if not total:
+        return 0.0
+    return sum((tokens - previous_tokens).values()) / total
+
+
+def is_material_change(previous_text, text, ratio):
+    """
+    Whether an edit needs moderating again: enough new tokens, a new link,
+    or a newly matching blocklist pattern, however small the edit
+    """
+    if ratio >= settings.REVIEW_EDIT_MATERIAL_RATIO:
+        return True
+    if len(LINK_PATTERN.findall(text)) > len(LINK_PATTERN.findall(previous_text)):
+        return True
+    return any(
+        re.search(pattern, text, re.IGNORECASE) and not re.search(pattern, previous_text, re.IGNORECASE)
+        for pattern in settings.MODERATION_HEURISTICS['blocklist']
+    )
+
+
+def edit_review(review, text):
+    """
+    Replace the review's text and record the edit.
+    The change is measured against the text of the current verdict, not the
+    previous edit, so a chain of small edits cannot rewrite a review unchecked.
+    A material change drops the verdict and queues the review for moderation
+    again, a minor one keeps the existing ModerationResult. Edits of a review
+    still awaiting its verdict are queued as well.
+    Returns the ReviewEdit, or None when the text is unchanged.
+    """
+    with transaction.atomic():
+        review = Review.objects.select_for_update().get(pk=review.pk)
+        if text == review.text:
+            return None
+
+        result = ModerationResult.objects.filter(review=review).first()
+        moderated_text = result.moderated_text if result is not None else review.text
+        ratio = change_ratio(moderated_text, text)
+        remoderate = result is not None and is_material_change(moderated_text, text, ratio)
+        edit = ReviewEdit.objects.create(
+            review=review, previous_text=review.text, text=text,
+            change_ratio=ratio, remoderated=remoderate,
+        )
+
+        review.text = text
+        review.edited_at = edit.created_at
+        review.save(update_fields=['text', 'edited_at'])
+
+        if remoderate:
+            # Deleting through the model keeps the counters in step,
+            # the review is pending again until the new verdict lands
+            result.delete()
+            if result.policy != 'trusted_skip':
+                # Take back what the old verdict added to the author's reputation,
+                # the new verdict counts when it is saved
+                adjust_reputations({review.user_id: Counter(
+                    checked_count=-1, flagged_count=-int(result.flagged), spam_count=-int(result.is_spam),
+                )})
+            enqueue_moderation(review)
+        elif result is None:
+            # A moderation still in flight may have read the old text and
+            # save its verdict after this edit. The task queued here finds a
+            # verdict for another text and moderates the new one.
+            enqueue_moderation(review)
+
+    return edit
@@ -0,0 +1,87 @@
+import json
+import logging
+import time
+import redis.asyncio as aioredis
+from django.conf import settings
+from redis.exceptions import RedisError
+from reviews.models import ModerationResult
+from .redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+VERDICT_CHANNEL = "moderation:verdicts:{}"
+
+
+def verdict_event(moderation_result):
+    """
+    Build the event payload sent to clients for a saved moderation result
+    """
+    return {
+        'review_id': moderation_result.review_id,
+        'moderation_status': moderation_result.status,
+        'is_flagged': moderation_result.flagged,
+        'is_spam': moderation_result.is_spam,
+        'moderated_at': moderation_result.updated_at.isoformat(),
+    }
+
+
+def publish_verdict(user_id, event):
+    """
+    Publish a verdict event to the author's channel.
+    Delivery is best effort, clients can still fall back to the detail endpoint.
+    """
+    try:
+        get_redis().publish(VERDICT_CHANNEL.format(user_id), json.dumps(event))
+    except RedisError as e:
+        logger.warning(f"Failed to publish verdict for review {event['review_id']}: {e}")
+
+
+def format_sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def verdict_stream(user_id, review_id=None):
+    """
+    Yield Server-Sent Events for the user's verdicts as they are published,
+    starting with the review's existing verdict when review_id is given.
+    Sends a comment line as keepalive and closes after SSE_MAX_DURATION
+    seconds, EventSource clients reconnect on their own.
+    """
+    client = aioredis.Redis.from_url(settings.REDIS_URL)
+    pubsub = client.pubsub()
+    # moderated_at of the last event sent per review, a verdict saved while
+    # the existing one was read arrives through both paths
+    sent = {}
+    try:
+        await pubsub.subscribe(VERDICT_CHANNEL.format(user_id))
+        # Subscribe first so nothing saved meanwhile is missed, then replay what already exists
+        if review_id is not None:
+            result = await ModerationResult.objects.filter(
+                review_id=review_id, review__user_id=user_id
+            ).afirst()
+            if result is not None:
+                event = verdict_event(result)
+                sent[event['review_id']] = event['moderated_at']
+                yield format_sse('verdict', event)
+
+        deadline = time.monotonic() + settings.SSE_MAX_DURATION
+        last_sent = time.monotonic()
+        while time.monotonic() < deadline:
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            if message is not None:
+                event = json.loads(message['data'])
+                if review_id is not None and event['review_id'] != review_id:
+                    continue
+                if sent.get(event['review_id']) == event['moderated_at']:
+                    continue
+                sent[event['review_id']] = event['moderated_at']
+                yield format_sse('verdict', event)
+                last_sent = time.monotonic()
+            elif time.monotonic() - last_sent >= settings.SSE_KEEPALIVE_INTERVAL:
+                yield ": keepalive\n\n"
+                last_sent = time.monotonic()
+    except RedisError as e:
+        logger.warning(f"Verdict stream for user {user_id} lost Redis: {e}")
+    finally:
+        await pubsub.aclose()
+        await client.aclose()
@@ -0,0 +1,67 @@
+import contextvars
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from django.conf import settings
+from django.db import connections
+from reviews.log import log_context
+from reviews.models import ModerationOutbox
+from .locks import moderation_lock
+from .moderation import moderate_review, save_moderation_result
+from .retries import needs_retry
+
+logger = logging.getLogger(__name__)
+
+_executor = ThreadPoolExecutor(
+    max_workers=settings.INLINE_MODERATION_WORKERS,
+    thread_name_prefix='inline-moderation',
+)
+# One slot per worker thread: when all are busy, for instance hung on a slow
+# external service, requests defer at once instead of queueing without bound
+_slots = threading.BoundedSemaphore(settings.INLINE_MODERATION_WORKERS)
+
+
+def _moderate_and_save(review):
+    try:
+        with log_context(review_id=review.id), moderation_lock(review.id) as acquired:
+            if not acquired:
+                return None
+            result = moderate_review(review.text, user_id=review.user_id, parallel_remote=True)
+            if needs_retry(result):
+                # Left to moderate_review_task, which retries with backoff
+                return None
+            moderation_result = save_moderation_result(review, result)
+        # Moderated in time, the outbox entry no longer needs publishing
+        ModerationOutbox.objects.filter(review=review).delete()
+        return moderation_result
+    finally:
+        connections.close_all()
+
+
+def moderate_inline(review, budget=None):
+    """
+    Moderate a committed review within the latency budget in seconds.
+    Returns the ModerationResult, or None when the budget ran out or every
+    inline worker is busy; the review's outbox entry then hands it to
+    moderate_review_task, and the inline run still saves its result if it
+    finishes later.
+    """
+    budget = budget if budget is not None else settings.INLINE_MODERATION_BUDGET
+    if not _slots.acquire(blocking=False):
+        logger.info(f"Inline moderation pool is saturated, deferring review {review.id}")
+        return None
+    try:
+        # Run in a copy of the caller's context so the request's trace carries on
+        future = _executor.submit(contextvars.copy_context().run, _moderate_and_save, review)
+    except Exception:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+    try:
+        return future.result(timeout=budget)
+    except TimeoutError:
+        logger.info(f"Inline moderation of review {review.id} exceeded {budget}s, deferring")
+        return None
+    except Exception as e:
+        logger.error(f"Inline moderation of review {review.id} failed, deferring: {e}")
+        return None
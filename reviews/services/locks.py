@@ -0,0 +1,37 @@
+import logging
+from contextlib import contextmanager
+from django.conf import settings
+from redis.exceptions import RedisError
+from .redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+
+@contextmanager
+def moderation_lock(review_id):
+    """
+    Hold a per-review Redis lock while a review is being moderated.
+    Yields True when this worker owns the lock and False when another
+    worker is already moderating the same review.
+    If Redis is unreachable the lock is skipped and True is yielded,
+    the upsert in save_moderation_result keeps a duplicate run harmless.
+    """
+    lock = get_redis().lock(
+        f"moderation:lock:{review_id}",
+        timeout=settings.MODERATION_LOCK_TIMEOUT,
+    )
+    try:
+        acquired = lock.acquire(blocking=False)
+    except RedisError as e:
+        logger.warning(f"Moderation lock unavailable for review {review_id}: {e}")
+        yield True
+        return
+
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            try:
+                lock.release()
+            except RedisError as e:
+                logger.warning(f"Failed to release moderation lock for review {review_id}: {e}")
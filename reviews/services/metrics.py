@@ -0,0 +1,72 @@
+import logging
+from redis.exceptions import RedisError
+from .redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+STAGE_KEY = "moderation:stages:{}"
+COUNTER_KEY = "moderation:counters"
+
+
+def record_stage(stage, seconds, hit):
+    """
+    Add one run of a pipeline stage to its call, hit and timing totals.
+    Metrics are best effort, a Redis failure never fails moderation.
+    """
+    key = STAGE_KEY.format(stage)
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        pipe.hincrby(key, 'calls', 1)
+        pipe.hincrby(key, 'hits', int(bool(hit)))
+        pipe.hincrbyfloat(key, 'total_ms', seconds * 1000)
+        pipe.execute()
+    except RedisError as e:
+        logger.warning(f"Failed to record metrics for stage {stage}: {e}")
+
+
+def incr_counter(name, amount=1):
+    """
+    Increment a named moderation counter.
+    """
+    try:
+        get_redis().hincrby(COUNTER_KEY, name, amount)
+    except RedisError as e:
+        logger.warning(f"Failed to increment counter {name}: {e}")
+
+
+def stage_stats(stages):
+    """
+    Return calls, hit rate and mean latency for each of the given stages.
+    """
+    stats = {}
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        for stage in stages:
+            pipe.hgetall(STAGE_KEY.format(stage))
+        rows = pipe.execute()
+    except RedisError as e:
+        logger.warning(f"Failed to read stage metrics: {e}")
+        return stats
+
+    for stage, row in zip(stages, rows):
+        calls = int(row.get(b'calls', 0))
+        hits = int(row.get(b'hits', 0))
+        total_ms = float(row.get(b'total_ms', 0.0))
+        stats[stage] = {
+            'calls': calls,
+            'hits': hits,
+            'hit_rate': hits / calls if calls else 0.0,
+            'mean_ms': total_ms / calls if calls else 0.0,
+        }
+    return stats
+
+
+def counters():
+    """
+    Return all named moderation counters.
+    """
+    try:
+        return {key.decode(): int(value) for key, value in get_redis().hgetall(COUNTER_KEY).items()}
+    except RedisError as e:
+        logger.warning(f"Failed to read moderation counters: {e}")
+        return {}
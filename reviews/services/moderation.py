@@ -1,17 +1,175 @@
+import contextvars
+import hashlib
+import json
+import logging
 import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from django.conf import settings
+from django.db import connections, transaction
+from redis.exceptions import RedisError
 from reviews.models import Review, ModerationResult
 from .spam import check_for_spam
+from .reputation import choose_policy, record_moderation_outcome
+from .metrics import record_stage
+from .events import publish_verdict, verdict_event
+from .redis_client import get_redis
+from .singleflight import single_flight
+from .tracing import span, traced
 from ..utils import log_ai_error
 
+logger = logging.getLogger(__name__)
 
-def moderate_review(review_text):
+VERDICT_CACHE_KEY = "moderation:cache:{}:{}"
+
+LINK_PATTERN = re.compile(r'https?://|www\.', re.IGNORECASE)
+
+
+def safe_openai_result():
+    """
+    Neutral OpenAI moderation result used when the call is skipped or fails
+    """
+    return {
+        'results': [{
+            'flagged': False,
+            'categories': {},
+            'category_scores': {}
+        }]
+    }
+
+
+def safe_spam_result():
+    """
+    Neutral spam detection result used when the call is skipped or fails
+    """
+    return {
+        'is_spam': False,
+        'spam_probability': 0.0,
+        'non_spam_probability': 1.0
+    }
+
+
+def verdict_cache_key(fingerprint):
+    """
+    Cache key of a verdict, scoped to the thresholds so changing them retires old verdicts
+    """
+    thresholds = json.dumps(settings.MODERATION_THRESHOLDS, sort_keys=True)
+    return VERDICT_CACHE_KEY.format(hashlib.sha1(thresholds.encode()).hexdigest()[:8], fingerprint)
+
+
+def apply_thresholds(result, thresholds):
+    """
+    Re-derive the flagged verdict of an OpenAI moderation result from its
+    category scores using our own per-category thresholds
+    """
+    scores = result.get('category_scores') or {}
+    exceeded = {category: scores[category] >= threshold
+                for category, threshold in thresholds.items() if category in scores}
+    if not exceeded:
+        return result
+    categories = dict(result.get('categories') or {})
+    categories.update(exceeded)
+    return {**result, 'categories': categories, 'flagged': any(categories.values())}
+
+
+def text_fingerprint(review_text):
+    """
+    Hash of the normalized review text, identical inputs share a fingerprint
+    """
+    normalized = " ".join(review_text.lower().split())
+    return hashlib.sha256(normalized.encode()).hexdigest()
+
+
+def trust_stage(state):
+    """
+    Skip the external checks entirely for trusted authors
+    """
+    state['policy'] = choose_policy(state['user_id'])
+    return state['policy'] == 'trusted_skip'
+
+
+def cache_stage(state):
+    """
+    Reuse the stored verdict for text that was already moderated
+    """
+    try:
+        cached = get_redis().get(verdict_cache_key(text_fingerprint(state['text'])))
+    except RedisError:
+        return False
+    if cached is None:
+        return False
+    cached = json.loads(cached)
+    state['openai_moderation'] = cached['openai_moderation']
+    state['spam_detection'] = cached['spam_detection']
+    return True
+
+
+def heuristics_stage(state):
+    """
+    Local checks that settle obvious cases without a remote call
+    """
+    heuristics = settings.MODERATION_HEURISTICS
+    text = state['text']
+
+    matched = [pattern for pattern in heuristics['blocklist'] if re.search(pattern, text, re.IGNORECASE)]
+    if matched:
+        state['openai_moderation'] = {
+            'results': [{
+                'flagged': True,
+                'categories': {'blocklist': True},
+                'category_scores': {'blocklist': 1.0}
+            }]
+        }
+        return True
+
+    max_links = heuristics['max_links']
+    if max_links is not None and len(LINK_PATTERN.findall(text)) > max_links:
+        state['spam_detection'] = {
+            'is_spam': True,
+            'spam_probability': 1.0,
+            'non_spam_probability': 0.0
+        }
+        return True
+
+    return False
+
+
+def spam_stage(state):
+    """
+    External spam detection, spam is hidden so it settles the verdict
+    """
+    try:
+        is_spam, spam_probability, non_spam_probability = check_for_spam(state['text'], raise_errors=True)
+        # Ensure we have valid values
+        if is_spam is None:
+            is_spam = False
+        if spam_probability is None:
+            spam_probability = 0.0
+        if non_spam_probability is None:
+            non_spam_probability = 1.0
+    except Exception as e:
+        # The error itself is already recorded by check_for_spam
+        logger.warning("Spam detection failed, continuing degraded",
+                       extra={'service': 'spam_detection', 'outcome': 'error', 'error': str(e)})
+        state['degraded'] = True
+        state['errors'].append(f"spam_detection: {e}")
+        return False
+
+    state['spam_detection'] = {
+        'is_spam': is_spam,
+        'spam_probability': spam_probability,
+        'non_spam_probability': non_spam_probability
+    }
+    return is_spam
+
+
+def openai_stage(state):
     """
-    Perform both OpenAI moderation and spam detection on review text
-    Returns combined results from both services
+    OpenAI moderation, the most expensive stage and the final word
     """
-    # OpenAI moderation
-    openai_result = None
+    review_text = state['text']
     try:
         url = "https://api.openai.com/v1/moderations"
         headers = {
@@ -22,67 +180,183 @@ def moderate_review(review_text):
             "input": review_text,
             "model": "omni-moderation-latest"
         }
-        response = requests.post(url, headers=headers, json=payload)
+        response = requests.post(url, headers=headers, json=payload, timeout=settings.OPENAI_MODERATION_TIMEOUT)
         response.raise_for_status()
         openai_result = response.json()
+        if settings.MODERATION_THRESHOLDS:
+            openai_result['results'][0] = apply_thresholds(
+                openai_result['results'][0], settings.MODERATION_THRESHOLDS
+            )
+        state['openai_moderation'] = openai_result
         
     except requests.RequestException as e:
         # Log the moderation error
         log_ai_error('moderation', review_text, e)
-        # Use safe defaults for OpenAI moderation
-        openai_result = {
-            'results': [{
-                'flagged': False,
-                'categories': {},
-                'category_scores': {}
-            }]
-        }
+        state['degraded'] = True
+        state['errors'].append(f"moderation: {e}")
     except Exception as e:
         # Log unexpected errors
         log_ai_error('moderation', review_text, f"Unexpected error: {e}")
-        # Use safe defaults
-        openai_result = {
-            'results': [{
-                'flagged': False,
-                'categories': {},
-                'category_scores': {}
-            }]
-        }
+        state['degraded'] = True
+        state['errors'].append(f"moderation: Unexpected error: {e}")
     
-    # Spam detection with error handling
+    return True
+
+
+# Keep in step with settings.MODERATION_STAGES, which validates MODERATION_PIPELINE
+STAGES = {
+    'trust': trust_stage,
+    'cache': cache_stage,
+    'heuristics': heuristics_stage,
+    'spam': spam_stage,
+    'openai': openai_stage,
+}
+
+# Stages that call external services
+REMOTE_STAGES = ('spam', 'openai')
+
+
+def run_stage(name, state):
+    """
+    Run one pipeline stage and record its timing and whether it decided
+    """
+    with span('moderation.stage', stage=name) as attributes:
+        started = time.perf_counter()
+        decided = STAGES[name](state)
+        elapsed = time.perf_counter() - started
+        attributes['decided'] = bool(decided)
+    record_stage(name, elapsed, decided)
+    logger.info("Moderation stage finished", extra={
+        'stage': name, 'latency_ms': round(elapsed * 1000, 1),
+        'outcome': 'decided' if decided else 'passed', 'sampled': True,
+    })
+    return decided
+
+
+def run_remote_stage(name, state):
+    """
+    run_stage for a worker thread, which must not leak its database connection
+    """
     try:
-        is_spam, spam_probability, non_spam_probability = check_for_spam(review_text)
-        # Ensure we have valid values
-        if is_spam is None:
-            is_spam = False
-        if spam_probability is None:
-            spam_probability = 0.0
-        if non_spam_probability is None:
-            non_spam_probability = 1.0
-    except Exception as e:
-        # Log spam detection error
-        log_ai_error('spam_detection', review_text, e)
-        print(f"Spam detection failed: {e}")
-        is_spam = False
-        spam_probability = 0.0
-        non_spam_probability = 1.0
+        return run_stage(name, state)
+    finally:
+        connections.close_all()
+
+
+@traced('moderation.moderate_review')
+def moderate_review(review_text, user_id=None, parallel_remote=False, trust=True):
+    """
+    Run the review text through the configured moderation pipeline
+    Stages run in the order of settings.MODERATION_PIPELINE and any stage
+    can settle the verdict, so later and more expensive stages are skipped
+    The author-specific trust stage runs first, the stages that depend on
+    the text alone are coalesced so concurrent identical texts share one run
+    With parallel_remote the local stages run first and the remote stages
+    then run concurrently, trading the short-circuit for lower latency
+    With trust=False the trust stage is left out, for the deferred checks
+    of reviews it skipped
+    Returns the combined OpenAI moderation and spam detection result,
+    degraded when an external service failed and neutral defaults were used
+    """
+    state = {
+        'text': review_text,
+        'user_id': user_id,
+        'policy': 'full',
+        'openai_moderation': safe_openai_result(),
+        'spam_detection': safe_spam_result(),
+        'degraded': False,
+        'errors': [],
+        'decided_by': None,
+    }
+    
+    if trust and 'trust' in settings.MODERATION_PIPELINE and run_stage('trust', state):
+        state['decided_by'] = 'trust'
+    else:
+        text_stages = [name for name in settings.MODERATION_PIPELINE if name != 'trust']
+        verdict = single_flight(
+            f"moderation:{text_fingerprint(review_text)}",
+            lambda: run_text_stages(review_text, text_stages, parallel_remote),
+        )
+        state.update(verdict)
     
     # Combine results
     combined_result = {
-        'openai_moderation': openai_result,
-        'spam_detection': {
-            'is_spam': is_spam,
-            'spam_probability': spam_probability,
-            'non_spam_probability': non_spam_probability
-        }
+        'openai_moderation': state['openai_moderation'],
+        'spam_detection': state['spam_detection'],
+        'policy': state['policy'],
+        'decided_by': state['decided_by'],
+        'degraded': state['degraded'],
+        'errors': state['errors'],
     }
     
+    # Failed calls fall back to neutral defaults, those verdicts are never cached
+    if state['decided_by'] not in (None, 'trust', 'cache') and not state['degraded']:
+        cache_verdict(review_text, combined_result)
+    
     return combined_result
 
 
+def run_text_stages(review_text, stages, parallel_remote=False):
+    """
+    Run the stages that depend only on the review text
+    Returns the verdict fields of the pipeline state
+    """
+    state = {
+        'text': review_text,
+        'openai_moderation': safe_openai_result(),
+        'spam_detection': safe_spam_result(),
+        'degraded': False,
+        'errors': [],
+        'decided_by': None,
+    }
+    remote = [name for name in stages if name in REMOTE_STAGES] if parallel_remote else []
+    
+    for name in stages:
+        if name in remote:
+            continue
+        if run_stage(name, state):
+            state['decided_by'] = name
+            break
+    
+    if state['decided_by'] is None and remote:
+        # The stages write to separate keys of the state
+        with ThreadPoolExecutor(max_workers=len(remote)) as pool:
+            # Each thread gets a copy of the log context so its records keep the review ID
+            futures = {
+                name: pool.submit(contextvars.copy_context().run, run_remote_stage, name, state)
+                for name in remote
+            }
+        decided = [name for name in remote if futures[name].result()]
+        state['decided_by'] = decided[0] if decided else None
+    
+    del state['text']
+    return state
+
+
+def cache_verdict(review_text, combined_result):
+    """
+    Store a verdict so identical text skips the pipeline next time
+    """
+    cached = {
+        'openai_moderation': combined_result['openai_moderation'],
+        'spam_detection': combined_result['spam_detection'],
+    }
+    try:
+        get_redis().set(
+            verdict_cache_key(text_fingerprint(review_text)),
+            json.dumps(cached),
+            ex=settings.MODERATION_CACHE_TTL,
+        )
+    except RedisError:
+        pass
+
+
+@traced('moderation.save_result')
 def save_moderation_result(review, combined_result):
     """
     Save both OpenAI moderation and spam detection results
+    Upserts on the review so a repeated run updates the existing row
+    instead of failing on the one-to-one constraint
     """
     openai_result = combined_result['openai_moderation']
     spam_result = combined_result['spam_detection']
@@ -100,17 +374,39 @@ def save_moderation_result(review, combined_result):
     if non_spam_probability is None or not isinstance(non_spam_probability, (int, float)):
         non_spam_probability = 1.0
     
-    print(f"Creating ModerationResult with: is_spam={is_spam}, spam_prob={spam_probability}, non_spam_prob={non_spam_probability}")
+    policy = combined_result.get('policy', 'full')
     
-    ModerationResult.objects.create(
+    moderation_result, created = ModerationResult.objects.update_or_create(
         review=review,
-        flagged=openai_result['results'][0]['flagged'],
-        categories=categories,
-        category_scores=openai_result['results'][0]['category_scores'],
-        is_spam=is_spam,
-        spam_probability=float(spam_probability),
-        non_spam_probability=float(non_spam_probability),
+        defaults={
+            'flagged': openai_result['results'][0]['flagged'],
+            'categories': categories,
+            'category_scores': openai_result['results'][0]['category_scores'],
+            'is_spam': is_spam,
+            'spam_probability': float(spam_probability),
+            'non_spam_probability': float(non_spam_probability),
+            'policy': policy,
+            'moderated_text': review.text,
+        },
     )
+    
+    logger.info("Moderation result saved", extra={
+        'review_id': review.id, 'outcome': moderation_result.status, 'policy': policy,
+        'decided_by': combined_result.get('decided_by'), 'spam_probability': float(spam_probability),
+        'sampled': True,
+    })
+    
+    # Only reviews that went through the external checks count towards reputation.
+    # A material edit takes back the old verdict's count, see edit_review, so
+    # each review counts once, with its latest verdict.
+    if created and policy != 'trusted_skip':
+        record_moderation_outcome(review.user_id, moderation_result.flagged, is_spam)
+    
+    # Subscribers only hear about the verdict once it is visible in the database
+    event = verdict_event(moderation_result)
+    transaction.on_commit(lambda: publish_verdict(review.user_id, event))
+    
+    return moderation_result
 
 
 def get_moderation_result(review_id):
@@ -0,0 +1,79 @@
+import logging
+import time
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from reviews.models import ModerationOutbox
+from .tracing import celery_headers, inject, record_span
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_moderation(review):
+    """
+    Record a pending moderation for the review in the outbox.
+    Call inside the transaction that creates the review so both rows
+    commit together and no review can be left without moderation.
+    """
+    return ModerationOutbox.objects.create(review=review, trace_context=inject())
+
+
+def enqueue_moderations(review_ids):
+    """
+    enqueue_moderation for many reviews with one INSERT
+    """
+    return ModerationOutbox.objects.bulk_create(ModerationOutbox(review_id=review_id) for review_id in review_ids)
+
+
+def relay_outbox(batch_size=None):
+    """
+    Publish one batch of outbox entries to Celery and remove them.
+    Entries that fail to publish stay in the outbox with their attempt
+    count bumped and are picked up again on the next run.
+    Returns the number of entries published.
+    """
+    from reviews.tasks import moderate_review_task
+
+    batch_size = batch_size or settings.OUTBOX_RELAY_BATCH_SIZE
+    published_ids = []
+
+    with transaction.atomic():
+        entries = list(
+            ModerationOutbox.objects.select_for_update(skip_locked=True)
+            .order_by('id')[:batch_size]
+        )
+        if not entries:
+            return 0
+
+        try:
+            # Reuse a single broker connection for the whole batch
+            with moderate_review_task.app.producer_or_acquire() as producer:
+                for entry in entries:
+                    moderate_review_task.apply_async(
+                        (entry.review_id,), producer=producer, headers=celery_headers(entry.trace_context),
+                    )
+                    published_ids.append(entry.id)
+                    record_span(entry.trace_context, 'outbox.wait', entry.created_at.timestamp(), time.time(),
+                                attempts=entry.attempts)
+        except Exception as e:
+            logger.error(f"Outbox relay failed after {len(published_ids)} of {len(entries)} entries: {e}")
+            failed_ids = [entry.id for entry in entries if entry.id not in published_ids]
+            ModerationOutbox.objects.filter(id__in=failed_ids).update(attempts=F('attempts') + 1)
+
+        ModerationOutbox.objects.filter(id__in=published_ids).delete()
+
+    return len(published_ids)
+
+
+def relay_outbox_until_empty(batch_size=None):
+    """
+    Drain the outbox batch by batch until it is empty or publishing stalls.
+    Returns the total number of entries published.
+    """
+    batch_size = batch_size or settings.OUTBOX_RELAY_BATCH_SIZE
+    total = 0
+    while True:
+        published = relay_outbox(batch_size)
+        total += published
+        if published < batch_size:
+            return total
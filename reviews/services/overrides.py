@@ -0,0 +1,131 @@
+from collections import Counter, defaultdict
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from redis.exceptions import RedisError
+from reviews.models import ModerationResult, ModerationOverride
+from . import counters
+from .moderation import text_fingerprint, verdict_cache_key
+from .products import transition_products
+from .reputation import adjust_reputations
+from .redis_client import get_redis
+
+
+def override_target(review_ids=None, filters=None):
+    """
+    Moderation results selected by explicit review IDs or by a filter expression
+    """
+    queryset = ModerationResult.objects.all()
+    if review_ids is not None:
+        return queryset.filter(review_id__in=review_ids)
+
+    if 'flagged' in filters:
+        queryset = queryset.filter(flagged=filters['flagged'])
+    if 'spam' in filters:
+        queryset = queryset.filter(is_spam=filters['spam'])
+    if 'user_id' in filters:
+        queryset = queryset.filter(review__user_id=filters['user_id'])
+    if 'created_after' in filters:
+        queryset = queryset.filter(review__created_at__gte=filters['created_after'])
+    if 'created_before' in filters:
+        queryset = queryset.filter(review__created_at__lt=filters['created_before'])
+    if 'min_spam_probability' in filters:
+        queryset = queryset.filter(spam_probability__gte=filters['min_spam_probability'])
+    return queryset
+
+
+def apply_overrides(moderator, review_ids=None, filters=None, flagged=None, is_spam=None, reason=''):
+    """
+    Override the flag and/or spam verdict of many reviews at once.
+    Results are processed in batches of OVERRIDE_BATCH_SIZE in id order, each
+    in its own transaction, so a broad filter never locks or loads everything
+    at once. Per batch one UPDATE changes the verdicts, one bulk INSERT records
+    the audit trail, and the counters, reputations and verdict cache are
+    adjusted together.
+    Returns the affected review IDs.
+    """
+    changes = {}
+    if flagged is not None:
+        changes['flagged'] = flagged
+    if is_spam is not None:
+        changes['is_spam'] = is_spam
+
+    target = override_target(review_ids, filters)
+    affected = []
+    last_id = 0
+    while True:
+        batch = override_batch(moderator, target.filter(id__gt=last_id), changes, reason)
+        if not batch:
+            break
+        affected.extend(row['review_id'] for row in batch)
+        last_id = batch[-1]['id']
+    return affected
+
+
+def override_batch(moderator, target, changes, reason):
+    """
+    Override the next batch of target results in one transaction.
+    Returns the rows as they were before the override.
+    """
+    with transaction.atomic():
+        previous = list(target.select_for_update().order_by('id').values(
+            'id', 'review_id', 'review__user_id', 'review__text', 'review__product_id', 'review__rating',
+            'flagged', 'is_spam', 'policy',
+        )[:settings.OVERRIDE_BATCH_SIZE])
+        if not previous:
+            return []
+
+        ModerationResult.objects.filter(id__in=[row['id'] for row in previous]).update(
+            updated_at=timezone.now(), **changes
+        )
+
+        ModerationOverride.objects.bulk_create(
+            ModerationOverride(
+                review_id=row['review_id'],
+                moderator=moderator,
+                previous_flagged=row['flagged'],
+                previous_is_spam=row['is_spam'],
+                flagged=changes.get('flagged', row['flagged']),
+                is_spam=changes.get('is_spam', row['is_spam']),
+                reason=reason,
+            )
+            for row in previous
+        )
+
+        # The UPDATE bypasses signals, so the counter deltas are applied here in one go
+        deltas = Counter()
+        product_rows = []
+        reputation_deltas = defaultdict(Counter)
+        for row in previous:
+            new_flagged = changes.get('flagged', row['flagged'])
+            new_is_spam = changes.get('is_spam', row['is_spam'])
+            before = counters.review_contribution(row['flagged'], row['is_spam'])
+            after = counters.review_contribution(new_flagged, new_is_spam)
+            deltas.update(counters.transition(before, after))
+            product_rows.append((row['review__product_id'], row['review__rating'], before, after))
+            # Corrected verdicts no longer count against the author, skipped reviews never counted
+            if row['policy'] != 'trusted_skip':
+                reputation_deltas[row['review__user_id']].update({
+                    'flagged_count': int(new_flagged) - int(row['flagged']),
+                    'spam_count': int(new_is_spam) - int(row['is_spam']),
+                })
+        counters.bump(deltas)
+        transition_products(product_rows)
+        adjust_reputations(reputation_deltas)
+
+        fingerprints = {text_fingerprint(row['review__text']) for row in previous}
+        transaction.on_commit(lambda: invalidate_cached_verdicts(fingerprints))
+
+    return previous
+
+
+def invalidate_cached_verdicts(fingerprints):
+    """
+    Drop cached verdicts so corrected texts are not served the old verdict again
+    """
+    if not fingerprints:
+        return
+    try:
+        get_redis().delete(*(verdict_cache_key(fingerprint) for fingerprint in fingerprints))
+    except RedisError:
+        pass
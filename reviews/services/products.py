@@ -0,0 +1,76 @@
+from collections import Counter, defaultdict
+from django.db.models import Count, F, Q
+from reviews.models import Product, Review, RATING_CHOICES
+from . import counters
+
+
+def product_deltas(contribution, rating=None):
+    """
+    Product aggregate deltas for one review contribution, see counters.review_contribution
+    """
+    visible = contribution.get(counters.VISIBLE, 0)
+    deltas = {
+        'visible_count': visible,
+        'flagged_count': contribution.get(counters.FLAGGED, 0),
+        'spam_count': contribution.get(counters.SPAM, 0),
+    }
+    if rating:
+        deltas[f'rating_{rating}_count'] = visible
+    return deltas
+
+
+def bump_product(product_id, deltas):
+    """
+    Apply aggregate deltas to a product with one UPDATE
+    """
+    changes = {field: F(field) + delta for field, delta in deltas.items() if delta}
+    if product_id is not None and changes:
+        Product.objects.filter(pk=product_id).update(**changes)
+
+
+def transition_products(rows):
+    """
+    Apply the aggregate changes of many reviews changing verdict at once,
+    one UPDATE per affected product. rows are (product_id, rating, before, after)
+    with before and after as returned by counters.review_contribution.
+    """
+    per_product = defaultdict(Counter)
+    for product_id, rating, before, after in rows:
+        if product_id is None:
+            continue
+        per_product[product_id].update(
+            counters.transition(product_deltas(before, rating), product_deltas(after, rating))
+        )
+    # Products are updated in id order, like the counters in counters.bump,
+    # so concurrent writers lock the rows in the same order
+    for product_id in sorted(per_product):
+        bump_product(product_id, per_product[product_id])
+
+
+def compute_product_stats(product):
+    """
+    Count a product's aggregates from scratch
+    """
+    unmoderated = Q(moderation_result__isnull=True)
+    visible = Q(moderation_result__flagged=False, moderation_result__is_spam=False) | unmoderated
+    aggregates = {
+        'review_count': Count('id'),
+        'visible_count': Count('id', filter=visible),
+        'flagged_count': Count('id', filter=Q(moderation_result__flagged=True)),
+        'spam_count': Count('id', filter=Q(moderation_result__is_spam=True)),
+    }
+    for rating in RATING_CHOICES:
+        aggregates[f'rating_{rating}_count'] = Count('id', filter=visible & Q(rating=rating))
+    return Review.objects.filter(product=product).aggregate(**aggregates)
+
+
+def rebuild_product_stats():
+    """
+    Recompute the aggregates of every product, to repair drift.
+    Returns the number of products rebuilt.
+    """
+    rebuilt = 0
+    for product in Product.objects.only('id').iterator():
+        Product.objects.filter(pk=product.pk).update(**compute_product_stats(product))
+        rebuilt += 1
+    return rebuilt
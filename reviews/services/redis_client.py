@@ -0,0 +1,19 @@
+import redis
+from django.conf import settings
+
+_client = None
+
+
+def get_redis():
+    """
+    Return a shared Redis client for locks, caches and pub/sub.
+    The connection pool is created lazily on first use.
+    """
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(
+            settings.REDIS_URL,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        )
+    return _client
@@ -0,0 +1,113 @@
+import random
+from django.conf import settings
+from django.db.models import Count, F, Q
+from reviews.models import ModerationResult, UserReputation
+
+# OpenAI moderation plus spam detection
+EXTERNAL_CALLS_PER_CHECK = 2
+
+
+def get_reputation(user_id):
+    """
+    Return the user's UserReputation, or None if they have no checked reviews yet.
+    """
+    return UserReputation.objects.filter(user_id=user_id).first()
+
+
+def is_trusted(reputation):
+    """
+    A user is trusted once enough of their reviews were checked and
+    almost none of them were flagged or spam.
+    """
+    policy = settings.MODERATION_TRUST_POLICY
+    return (
+        reputation is not None
+        and reputation.checked_count >= policy['min_checked_reviews']
+        and reputation.bad_ratio <= policy['max_bad_ratio']
+    )
+
+
+def choose_policy(user_id):
+    """
+    Decide how a review by this user is moderated.
+    Returns 'full' for new or suspicious users, and for trusted users either
+    'sampled' (checks still run) or 'trusted_skip' (external calls deferred
+    to run_deferred_checks, off the publishing path).
+    """
+    policy = settings.MODERATION_TRUST_POLICY
+    if not policy['enabled'] or user_id is None:
+        return 'full'
+    if not is_trusted(get_reputation(user_id)):
+        return 'full'
+    if random.random() < policy['sample_rate']:
+        return 'sampled'
+    return 'trusted_skip'
+
+
+def record_moderation_outcome(user_id, flagged, is_spam):
+    """
+    Add one checked review to the user's reputation counters.
+    """
+    UserReputation.objects.get_or_create(user_id=user_id)
+    UserReputation.objects.filter(user_id=user_id).update(
+        checked_count=F('checked_count') + 1,
+        flagged_count=F('flagged_count') + int(bool(flagged)),
+        spam_count=F('spam_count') + int(bool(is_spam)),
+    )
+
+
+def adjust_reputations(deltas):
+    """
+    Apply flagged/spam count deltas per user, such as those of corrected
+    verdicts, one UPDATE per user in id order. deltas maps a user ID to a
+    Counter of flagged_count and spam_count changes.
+    """
+    for user_id in sorted(deltas):
+        changes = {field: F(field) + delta for field, delta in deltas[user_id].items() if delta}
+        if changes:
+            UserReputation.objects.filter(user_id=user_id).update(**changes)
+
+
+def rebuild_reputations():
+    """
+    Recompute every user's counters from their stored moderation history.
+    Skipped reviews are not evidence and are left out.
+    Returns the number of users updated.
+    """
+    totals = (
+        ModerationResult.objects.exclude(policy='trusted_skip')
+        .values('review__user_id')
+        .annotate(
+            checked=Count('id'),
+            flagged=Count('id', filter=Q(flagged=True)),
+            spam=Count('id', filter=Q(is_spam=True)),
+        )
+    )
+    updated = 0
+    for row in totals:
+        UserReputation.objects.update_or_create(
+            user_id=row['review__user_id'],
+            defaults={
+                'checked_count': row['checked'],
+                'flagged_count': row['flagged'],
+                'spam_count': row['spam'],
+            },
+        )
+        updated += 1
+    return updated
+
+
+def policy_stats():
+    """
+    Count moderation results per policy and the external calls avoided
+    so far by skipping checks for trusted users, until their deferred checks run.
+    """
+    counts = dict(
+        ModerationResult.objects.values_list('policy').annotate(total=Count('id')).order_by()
+    )
+    skipped = counts.get('trusted_skip', 0)
+    return {
+        'policies': {key: counts.get(key, 0) for key, _ in ModerationResult.POLICY_CHOICES},
+        'external_calls_avoided': skipped * EXTERNAL_CALLS_PER_CHECK,
+        'trust_policy': settings.MODERATION_TRUST_POLICY,
+    }
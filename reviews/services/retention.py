@@ -0,0 +1,112 @@
+import gzip
+import json
+import logging
+from datetime import timedelta
+from pathlib import Path
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+from reviews.models import AIServiceError, ModerationResult
+
+logger = logging.getLogger(__name__)
+
+AI_ERROR_FIELDS = ['id', 'service', 'input_text', 'error_message', 'status_code', 'timestamp']
+MODERATION_SCORE_FIELDS = ['id', 'review_id', 'flagged', 'categories', 'category_scores', 'created_at']
+
+
+def _archive_path(name):
+    archive_dir = Path(settings.ARCHIVE_DIR)
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    stamp = timezone.now().strftime('%Y%m%dT%H%M%S')
+    return archive_dir / f"{name}-{stamp}.jsonl.gz"
+
+
+def _write_rows(archive, rows):
+    for row in rows:
+        archive.write(json.dumps(row, cls=DjangoJSONEncoder) + "\n")
+
+
+def archive_ai_errors(days=None, batch_size=None, dry_run=False):
+    """
+    Move AIServiceError rows older than the retention window into a
+    gzip-compressed JSONL archive and delete them in bounded batches.
+    Returns (rows_archived, archive_path).
+    """
+    days = days if days is not None else settings.RETENTION_POLICIES['ai_errors']['days']
+    batch_size = batch_size or settings.RETENTION_BATCH_SIZE
+    if days is None:
+        return 0, None
+
+    cutoff = timezone.now() - timedelta(days=days)
+    queryset = AIServiceError.objects.filter(timestamp__lt=cutoff).order_by('id')
+    if dry_run:
+        return queryset.count(), None
+
+    path = _archive_path('ai_errors')
+    archived = 0
+    with gzip.open(path, 'wt', encoding='utf-8') as archive:
+        while True:
+            rows = list(queryset.values(*AI_ERROR_FIELDS)[:batch_size])
+            if not rows:
+                break
+            _write_rows(archive, rows)
+            # Flush before deleting so a crash never loses rows that are not on disk
+            archive.flush()
+            with transaction.atomic():
+                AIServiceError.objects.filter(id__in=[row['id'] for row in rows]).delete()
+            archived += len(rows)
+
+    if not archived:
+        path.unlink()
+        return 0, None
+
+    logger.info(f"Archived {archived} AI service errors older than {days} days to {path}")
+    return archived, path
+
+
+def archive_moderation_scores(days=None, batch_size=None, dry_run=False):
+    """
+    Archive the per-category scores of ModerationResult rows older than the
+    retention window and clear them from the database in bounded batches.
+    The verdict and its categories stay in place so archived reviews keep
+    their visibility and flagged categories.
+    Returns (rows_archived, archive_path).
+    """
+    days = days if days is not None else settings.RETENTION_POLICIES['moderation_scores']['days']
+    batch_size = batch_size or settings.RETENTION_BATCH_SIZE
+    if days is None:
+        return 0, None
+
+    cutoff = timezone.now() - timedelta(days=days)
+    queryset = (
+        ModerationResult.objects.filter(created_at__lt=cutoff)
+        .exclude(category_scores={})
+        .order_by('id')
+    )
+    if dry_run:
+        return queryset.count(), None
+
+    path = _archive_path('moderation_scores')
+    archived = 0
+    with gzip.open(path, 'wt', encoding='utf-8') as archive:
+        while True:
+            rows = list(queryset.values(*MODERATION_SCORE_FIELDS)[:batch_size])
+            if not rows:
+                break
+            _write_rows(archive, rows)
+            archive.flush()
+            with transaction.atomic():
+                # updated_at versions the verdict for analytics snapshots, archiving
+                # leaves the verdict and its categories as they are
+                ModerationResult.objects.filter(id__in=[row['id'] for row in rows]).update(
+                    category_scores={}, scores_archived_at=timezone.now()
+                )
+            archived += len(rows)
+
+    if not archived:
+        path.unlink()
+        return 0, None
+
+    logger.info(f"Archived {archived} moderation score payloads older than {days} days to {path}")
+    return archived, path
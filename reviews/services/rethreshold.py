@@ -0,0 +1,155 @@
+import logging
+from collections import Counter, defaultdict
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from reviews.models import ModerationResult
+from . import counters
+from .products import transition_products
+from .reputation import adjust_reputations
+
+logger = logging.getLogger(__name__)
+
+
+def evaluate_chunk(rows, categories, thresholds):
+    """
+    Vectorized re-evaluation of one chunk of (id, flagged, is_spam, categories, category_scores, ...) rows.
+    A category is flagged when its score reaches its threshold; categories without
+    a configured threshold keep their stored flag. Rows with none of the configured
+    categories in their scores cannot be re-evaluated and keep their verdict.
+    Returns (new_flagged, exceeded, evaluable) NumPy arrays.
+    """
+    import numpy as np
+
+    scores = np.full((len(rows), len(categories)), np.nan)
+    for i, row in enumerate(rows):
+        row_scores = row[4] or {}
+        for j, category in enumerate(categories):
+            value = row_scores.get(category)
+            if isinstance(value, (int, float)):
+                scores[i, j] = value
+
+    # NaN never compares as exceeding
+    exceeded = scores >= thresholds
+    evaluable = ~np.isnan(scores).all(axis=1)
+
+    # Flags of categories outside the thresholds still count
+    other_flags = np.array([
+        any(flag for category, flag in (row[3] or {}).items() if category not in categories)
+        for row in rows
+    ], dtype=bool)
+    old_flagged = np.array([row[1] for row in rows], dtype=bool)
+    new_flagged = np.where(evaluable, exceeded.any(axis=1) | other_flags, old_flagged)
+    return new_flagged, exceeded, evaluable
+
+
+def rethreshold(thresholds=None, apply=False, chunk_size=None):
+    """
+    Re-derive flagged verdicts from stored category scores under new thresholds,
+    without calling OpenAI. Verdicts set by a moderator override are left alone.
+    Runs as a dry run unless apply is set, then changed rows are written
+    with one batched UPDATE per chunk.
+    Returns a summary of how many verdicts change.
+    """
+    import numpy as np
+
+    thresholds = thresholds if thresholds is not None else settings.MODERATION_THRESHOLDS
+    chunk_size = chunk_size or settings.RETHRESHOLD_CHUNK_SIZE
+    categories = sorted(thresholds)
+    threshold_vector = np.array([thresholds[category] for category in categories], dtype=float)
+
+    summary = {
+        'evaluated': 0,
+        'skipped': 0,
+        'unchanged': 0,
+        'newly_flagged': 0,
+        'newly_unflagged': 0,
+        'exceeded_by_category': Counter(),
+        'applied': apply,
+        'written': 0,
+    }
+    if not categories:
+        return summary
+
+    last_id = 0
+    while True:
+        rows = list(
+            ModerationResult.objects.filter(id__gt=last_id)
+            .exclude(review__moderation_overrides__isnull=False)
+            .order_by('id')
+            .values_list('id', 'flagged', 'is_spam', 'categories', 'category_scores',
+                         'review__product_id', 'review__rating', 'review__user_id', 'policy',
+                         'updated_at')[:chunk_size]
+        )
+        if not rows:
+            break
+        last_id = rows[-1][0]
+
+        new_flagged, exceeded, evaluable = evaluate_chunk(rows, categories, threshold_vector)
+        old_flagged = np.array([row[1] for row in rows], dtype=bool)
+        changed = np.flatnonzero(new_flagged != old_flagged)
+
+        summary['evaluated'] += int(evaluable.sum())
+        summary['skipped'] += int((~evaluable).sum())
+        summary['newly_flagged'] += int((new_flagged & ~old_flagged).sum())
+        summary['newly_unflagged'] += int((~new_flagged & old_flagged).sum())
+        summary['unchanged'] += int(evaluable.sum()) - len(changed)
+        for j, count in enumerate(exceeded.sum(axis=0)):
+            summary['exceeded_by_category'][categories[j]] += int(count)
+
+        if apply and len(changed):
+            summary['written'] += apply_chunk(
+                [rows[i] for i in changed], new_flagged[changed], exceeded[changed], categories
+            )
+
+    summary['exceeded_by_category'] = dict(summary['exceeded_by_category'])
+    return summary
+
+
+def apply_chunk(rows, new_flagged, exceeded, categories):
+    """
+    Write the changed verdicts of one chunk and adjust the counters, product
+    aggregates and reputations to match. Rows moderated, overridden or edited
+    since they were read are skipped, their deltas would be computed from
+    stale verdicts. Returns the number of verdicts written.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        current = dict(
+            ModerationResult.objects.select_for_update()
+            .filter(id__in=[row[0] for row in rows])
+            .exclude(review__moderation_overrides__isnull=False)
+            .values_list('id', 'updated_at')
+        )
+        results = []
+        deltas = Counter()
+        product_rows = []
+        reputation_deltas = defaultdict(Counter)
+        for row, flagged, row_exceeded in zip(rows, new_flagged, exceeded):
+            result_id, old_flagged, is_spam, stored_categories, scores, product_id, rating, user_id, policy, \
+                updated_at = row
+            if current.get(result_id) != updated_at:
+                continue
+            updated_categories = dict(stored_categories or {})
+            for category, hit in zip(categories, row_exceeded):
+                if category in (scores or {}):
+                    updated_categories[category] = bool(hit)
+            results.append(ModerationResult(
+                id=result_id, flagged=bool(flagged), categories=updated_categories, updated_at=now,
+            ))
+            before = counters.review_contribution(old_flagged, is_spam)
+            after = counters.review_contribution(bool(flagged), is_spam)
+            deltas.update(counters.transition(before, after))
+            product_rows.append((product_id, rating, before, after))
+            # As in apply_overrides, skipped reviews never counted towards reputation
+            if policy != 'trusted_skip':
+                reputation_deltas[user_id]['flagged_count'] += int(bool(flagged)) - int(old_flagged)
+
+        ModerationResult.objects.bulk_update(results, ['flagged', 'categories', 'updated_at'])
+        counters.bump(deltas)
+        transition_products(product_rows)
+        adjust_reputations(reputation_deltas)
+    if len(results) < len(rows):
+        logger.info(f"Re-thresholding skipped {len(rows) - len(results)} results changed meanwhile")
+    logger.info(f"Re-thresholding updated {len(results)} moderation results")
+    return len(results)
@@ -0,0 +1,136 @@
+import logging
+import random
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from reviews.models import ModerationFailure
+from .outbox import enqueue_moderations
+from .tracing import celery_headers
+
+logger = logging.getLogger(__name__)
+
+
+def needs_retry(combined_result):
+    """
+    Whether a moderation result must be retried instead of saved.
+    A degraded run that still flagged the review or found spam is kept,
+    one that fell back to "clean" would let the review through unchecked.
+    """
+    if not combined_result.get('degraded'):
+        return False
+    flagged = combined_result['openai_moderation']['results'][0]['flagged']
+    return not flagged and not combined_result['spam_detection'].get('is_spam', False)
+
+
+def retry_delay(attempt):
+    """
+    Seconds to wait before the given retry, doubling with every attempt up to
+    the maximum, with jitter over the upper half so retries of many reviews
+    that failed together reach the recovering service spread out.
+    Capped below the broker's visibility timeout, after which Redis would
+    redeliver the delayed task.
+    """
+    ceiling = min(
+        settings.MODERATION_RETRY_MAX_DELAY,
+        settings.CELERY_BROKER_TRANSPORT_OPTIONS['visibility_timeout'] - settings.MODERATION_LOCK_TIMEOUT,
+        settings.MODERATION_RETRY_BASE_DELAY * 2 ** (attempt - 1),
+    )
+    return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+
+def record_failure(review, combined_result):
+    """
+    Count a failed moderation attempt and schedule the next one, or move the
+    review to the dead letters once MODERATION_MAX_ATTEMPTS is reached.
+    Returns the ModerationFailure.
+    """
+    from reviews.tasks import moderate_review_task
+
+    with transaction.atomic():
+        failure, _ = ModerationFailure.objects.select_for_update().get_or_create(review=review)
+        failure.attempts += 1
+        failure.last_error = "\n".join(combined_result.get('errors') or []) or "Moderation degraded"
+
+        if failure.attempts >= settings.MODERATION_MAX_ATTEMPTS:
+            failure.status = 'dead'
+            failure.next_attempt_at = None
+            logger.error("Moderation moved to dead letters", extra={
+                'review_id': review.id, 'attempts': failure.attempts, 'outcome': 'dead',
+            })
+        else:
+            delay = retry_delay(failure.attempts)
+            failure.status = 'retrying'
+            failure.next_attempt_at = timezone.now() + timedelta(seconds=delay)
+            headers = celery_headers()
+            transaction.on_commit(
+                lambda: moderate_review_task.apply_async((review.id,), countdown=delay, headers=headers)
+            )
+            logger.warning("Moderation failed, retry scheduled", extra={
+                'review_id': review.id, 'attempts': failure.attempts, 'retry_in': round(delay, 1),
+                'outcome': 'retrying',
+            })
+        failure.save()
+    return failure
+
+
+def resolve_failure(review):
+    """
+    Forget the failures of a review once it was moderated
+    """
+    ModerationFailure.objects.filter(review=review).delete()
+
+
+def retry_pending(review_id):
+    """
+    Whether the review waits for a scheduled retry that is not due yet,
+    so a task running now is a duplicate, for instance one redelivered by the broker
+    """
+    return ModerationFailure.objects.filter(
+        review_id=review_id, status='retrying', next_attempt_at__gt=timezone.now(),
+    ).exists()
+
+
+def sweep_overdue_retries(grace=None):
+    """
+    Queue through the outbox the retries still not run grace seconds after
+    they were due, because their task was never published or was lost.
+    Returns the queued review IDs.
+    """
+    grace = grace if grace is not None else settings.MODERATION_RETRY_SWEEP_GRACE
+    cutoff = timezone.now() - timedelta(seconds=grace)
+    with transaction.atomic():
+        overdue = ModerationFailure.objects.select_for_update(skip_locked=True).filter(
+            status='retrying', next_attempt_at__lt=cutoff,
+        )
+        failures = list(overdue.values_list('id', 'review_id'))
+        review_ids = [review_id for _, review_id in failures]
+        enqueue_moderations(review_ids)
+        # Due now, like requeued dead letters
+        ModerationFailure.objects.filter(id__in=[failure_id for failure_id, _ in failures]).update(
+            next_attempt_at=None, updated_at=timezone.now(),
+        )
+    if review_ids:
+        logger.warning("Overdue moderation retries queued again", extra={
+            'count': len(review_ids), 'outcome': 'swept',
+        })
+    return review_ids
+
+
+def requeue_failures(failure_ids=None):
+    """
+    Give dead letters a fresh set of attempts and queue them through the
+    outbox, all of them or only the given IDs.
+    Returns the requeued review IDs.
+    """
+    with transaction.atomic():
+        dead = ModerationFailure.objects.select_for_update().filter(status='dead')
+        if failure_ids is not None:
+            dead = dead.filter(id__in=failure_ids)
+        failures = list(dead.values_list('id', 'review_id'))
+        review_ids = [review_id for _, review_id in failures]
+        enqueue_moderations(review_ids)
+        ModerationFailure.objects.filter(id__in=[failure_id for failure_id, _ in failures]).update(
+            status='retrying', attempts=0, next_attempt_at=None, updated_at=timezone.now(),
+        )
+    return review_ids
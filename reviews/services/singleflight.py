@@ -0,0 +1,61 @@
+import json
+import logging
+import time
+from django.conf import settings
+from redis.exceptions import RedisError
+from .metrics import incr_counter
+from .redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL = 0.05
+
+
+def single_flight(key, compute):
+    """
+    Run compute() at most once at a time per key across all workers.
+    The first caller becomes the leader and shares its JSON-serializable
+    result; concurrent callers wait up to SINGLE_FLIGHT_WAIT seconds to
+    reuse it and compute on their own if the leader is slow or gone.
+    Without Redis every caller simply computes.
+    """
+    client = get_redis()
+    result_key = f"singleflight:{key}:result"
+    lock = client.lock(f"singleflight:{key}", timeout=settings.SINGLE_FLIGHT_TTL)
+
+    try:
+        leader = lock.acquire(blocking=False)
+    except RedisError as e:
+        logger.warning(f"Single-flight unavailable for {key}: {e}")
+        return compute()
+
+    if leader:
+        try:
+            result = compute()
+            try:
+                client.set(result_key, json.dumps(result), ex=settings.SINGLE_FLIGHT_RESULT_TTL)
+            except RedisError as e:
+                logger.warning(f"Failed to share single-flight result for {key}: {e}")
+            return result
+        finally:
+            try:
+                lock.release()
+            except RedisError:
+                pass
+
+    deadline = time.monotonic() + settings.SINGLE_FLIGHT_WAIT
+    try:
+        while time.monotonic() < deadline:
+            shared = client.get(result_key)
+            if shared is not None:
+                incr_counter('coalesced')
+                return json.loads(shared)
+            if not lock.locked():
+                # The leader finished without sharing a result or died
+                break
+            time.sleep(POLL_INTERVAL)
+    except RedisError as e:
+        logger.warning(f"Lost Redis while waiting on single-flight {key}: {e}")
+
+    incr_counter('coalesce_fallbacks')
+    return compute()
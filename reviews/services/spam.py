@@ -1,36 +1,46 @@
+import logging
 import os
+import time
 import requests
 from ..utils import log_ai_error
+from .tracing import traced
+
+logger = logging.getLogger(__name__)
 
 SPAM_URL = os.getenv("SPAM_DETECTOR_URL") 
 
-def check_for_spam(text):
+@traced('spam.check')
+def check_for_spam(text, raise_errors=False):
     """
     Check if text is spam using external spam detection API
     Returns: (is_spam, spam_probability, non_spam_probability)
-    Always returns valid values even if API is unavailable
+    Always returns valid values even if API is unavailable, unless
+    raise_errors is set, then failures are logged and re-raised
     """
     if not SPAM_URL:
-        print("Spam detection API not configured")
+        logger.info("Spam detection API not configured",
+                    extra={'service': 'spam_detection', 'outcome': 'unconfigured', 'sampled': True})
         return False, 0.0, 1.0
     
     try:
         payload = {"text": text}
         
-        print(f"Spam detection request: URL={SPAM_URL}, Payload={payload}")
-        
+        started = time.perf_counter()
         response = requests.post(
             SPAM_URL,
             json=payload,
             timeout=10  
         )
-        
-        print(f"Spam detection response: Status={response.status_code}, Headers={response.headers}")
+        latency_ms = round((time.perf_counter() - started) * 1000, 1)
         
         response.raise_for_status()
         data = response.json()
         
-        print(f"Spam detection result: {data}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Spam detection exchange", extra={
+                'service': 'spam_detection', 'url': SPAM_URL, 'payload': payload,
+                'response_headers': dict(response.headers), 'response': data, 'sampled': True,
+            })
         
         is_spam = bool(data.get("is_spam", False))
         spam_probability = float(data.get("spam_probability", 0.0))
@@ -40,6 +50,11 @@ def check_for_spam(text):
             spam_probability = 0.0
         if non_spam_probability < 0 or non_spam_probability > 1:
             non_spam_probability = 1.0
+        
+        logger.info("Spam detection completed", extra={
+            'service': 'spam_detection', 'latency_ms': latency_ms, 'status_code': response.status_code,
+            'outcome': 'spam' if is_spam else 'clean', 'spam_probability': spam_probability, 'sampled': True,
+        })
             
         return is_spam, spam_probability, non_spam_probability
         
@@ -48,12 +63,18 @@ def check_for_spam(text):
         if hasattr(e, 'response') and e.response:
             status_code = e.response.status_code
         log_ai_error('spam_detection', text, e, status_code=status_code)
+        if raise_errors:
+            raise
         return False, 0.0, 1.0
         
     except (ValueError, KeyError) as e:
         log_ai_error('spam_detection', text, f"Data parsing error: {e}")
+        if raise_errors:
+            raise
         return False, 0.0, 1.0
         
     except Exception as e:
         log_ai_error('spam_detection', text, f"Unexpected error: {e}")
+        if raise_errors:
+            raise
         return False, 0.0, 1.0
@@ -0,0 +1,98 @@
+import logging
+import time
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from redis.exceptions import RedisError
+from .redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+BLACKLIST_KEY = "jwt:blacklist:{}"
+LAST_LOGIN_KEY = "jwt:last_login:{}"
+
+
+def blacklist_jti(jti, exp):
+    """
+    Revoke a token ID until the token would have expired anyway.
+    Returns False when it was already revoked, so of two concurrent
+    rotations of one refresh token only the first succeeds.
+    """
+    ttl = int(exp - time.time())
+    if ttl <= 0:
+        return True
+    return bool(get_redis().set(BLACKLIST_KEY.format(jti), 1, ex=ttl, nx=True))
+
+
+def database_fallback_active():
+    """
+    Whether tokens revoked in the database blacklist may still be valid,
+    after one refresh token lifetime they have all expired
+    """
+    since = settings.TOKEN_BLACKLIST_REDIS_SINCE
+    if since is not None and timezone.is_naive(since):
+        since = timezone.make_aware(since, timezone.utc)
+    return since is not None and timezone.now() < since + settings.SIMPLE_JWT['REFRESH_TOKEN_LIFETIME']
+
+
+def is_blacklisted(jti):
+    """
+    Whether a token ID was revoked, raises RedisError when Redis is unavailable.
+    Within a refresh token lifetime of TOKEN_BLACKLIST_REDIS_SINCE, tokens
+    revoked in simplejwt's database tables before the move count as well.
+    """
+    if get_redis().exists(BLACKLIST_KEY.format(jti)):
+        return True
+    if not database_fallback_active():
+        return False
+    from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+    return BlacklistedToken.objects.filter(token__jti=jti).exists()
+
+
+def record_login(user):
+    """
+    Update last_login in the background, at most once per user every
+    LAST_LOGIN_COALESCE_SECONDS, so logins do not each write the user row
+    """
+    from reviews.tasks import update_last_login_task
+
+    try:
+        first = get_redis().set(LAST_LOGIN_KEY.format(user.pk), 1, nx=True, ex=settings.LAST_LOGIN_COALESCE_SECONDS)
+    except RedisError as e:
+        logger.warning(f"Last login coalescing unavailable for user {user.pk}: {e}")
+        first = True
+    if first:
+        login_time = timezone.now().isoformat()
+        transaction.on_commit(lambda: update_last_login_task.delay(user.pk, login_time))
+
+
+def prune_tokens(batch_size=None):
+    """
+    Move the still valid blacklist entries of simplejwt's database tables to
+    Redis, then delete expired outstanding tokens and their blacklist rows
+    in bounded batches. Returns (entries_moved, tokens_deleted).
+    """
+    from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+    batch_size = batch_size or settings.TOKEN_PRUNE_BATCH_SIZE
+    now = timezone.now()
+
+    moved = 0
+    for jti, expires_at in BlacklistedToken.objects.filter(token__expires_at__gt=now).values_list(
+        'token__jti', 'token__expires_at'
+    ).iterator():
+        blacklist_jti(jti, expires_at.timestamp())
+        moved += 1
+
+    deleted = 0
+    while True:
+        ids = list(OutstandingToken.objects.filter(expires_at__lte=now).values_list('id', flat=True)[:batch_size])
+        if not ids:
+            break
+        with transaction.atomic():
+            BlacklistedToken.objects.filter(token_id__in=ids).delete()
+            OutstandingToken.objects.filter(id__in=ids).delete()
+        deleted += len(ids)
+
+    logger.info(f"Moved {moved} blacklist entries to Redis and pruned {deleted} expired tokens")
+    return moved, deleted
@@ -0,0 +1,241 @@
+"""
+Lightweight tracing of a review's moderation, from the request that created it
+through the outbox and Celery to the external services and the database write
+"""
+import atexit
+import contextlib
+import contextvars
+import functools
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+import uuid
+from django.conf import settings
+from redis.exceptions import RedisError
+from .redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+# Spans are exported through this logger, see TRACE_EXPORT_FILE
+span_logger = logging.getLogger('reviews.trace')
+
+TRACE_KEY = "trace:review:{}"
+# Spans written to Redis per pipeline round trip
+STORE_BATCH_SIZE = 100
+
+# (trace, span_id): the trace dict is shared by all spans of the trace,
+# span_id is the active span and changes per context
+_current = contextvars.ContextVar('trace_context', default=None)
+
+
+def new_id():
+    return uuid.uuid4().hex[:16]
+
+
+@contextlib.contextmanager
+def start_trace(review_id=None):
+    """
+    Begin a new trace, sampled at TRACE_SAMPLE_RATE.
+    Yields the trace, or None when not sampled; set its review_id
+    once the review exists so the spans can be found by review.
+    """
+    if random.random() >= settings.TRACE_SAMPLE_RATE:
+        yield None
+        return
+    trace = {'trace_id': uuid.uuid4().hex, 'review_id': review_id}
+    token = _current.set((trace, None))
+    try:
+        yield trace
+    finally:
+        _current.reset(token)
+
+
+@contextlib.contextmanager
+def continue_trace(carrier):
+    """
+    Resume a trace propagated through a carrier such as Celery headers
+    """
+    if not carrier:
+        yield None
+        return
+    trace = {'trace_id': carrier['trace_id'], 'review_id': carrier.get('review_id')}
+    token = _current.set((trace, carrier.get('span_id')))
+    try:
+        yield trace
+    finally:
+        _current.reset(token)
+
+
+def inject():
+    """
+    Carrier of the active trace context to propagate it to another process,
+    None outside a trace
+    """
+    current = _current.get()
+    if current is None:
+        return None
+    trace, span_id = current
+    return {**trace, 'span_id': span_id}
+
+
+@contextlib.contextmanager
+def span(name, **attributes):
+    """
+    Time the block as a child span of the active span, a no-op outside a trace.
+    Yields the span's attributes so the block can add to them.
+    """
+    current = _current.get()
+    if current is None:
+        yield attributes
+        return
+
+    trace, parent_id = current
+    span_id = new_id()
+    token = _current.set((trace, span_id))
+    start = time.time()
+    started = time.perf_counter()
+    status = 'ok'
+    try:
+        yield attributes
+    except BaseException:
+        status = 'error'
+        raise
+    finally:
+        _current.reset(token)
+        export_span(trace, name, start, start + time.perf_counter() - started,
+                    span_id=span_id, parent_id=parent_id, status=status, **attributes)
+
+
+def traced(name):
+    """
+    Decorator running the function inside a span of the given name
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def celery_headers(carrier=None):
+    """
+    Task headers carrying the trace, the given carrier or the active trace,
+    stamped with the publish time so the worker can measure the queue wait
+    """
+    carrier = carrier if carrier is not None else inject()
+    if not carrier:
+        return {}
+    return {'trace': {**carrier, 'published_at': time.time()}}
+
+
+def record_span(carrier, name, start, end, **attributes):
+    """
+    Record a span measured elsewhere, such as time spent waiting in a queue,
+    as a child of the carrier's span
+    """
+    if carrier:
+        export_span(carrier, name, start, end, span_id=new_id(), parent_id=carrier.get('span_id'), **attributes)
+
+
+class SpanStore:
+    """
+    Buffer finished spans and write them to Redis in batches from a background
+    thread, so tracing adds no Redis round trips to requests. Spans are dropped
+    when the buffer is full.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pid = None
+        self.queue = None
+        self.dropped = 0
+        atexit.register(self.flush)
+
+    def put(self, entry):
+        if self.pid != os.getpid():
+            # First span of this process, forked workers start their own thread
+            self.start()
+        try:
+            self.queue.put_nowait(entry)
+        except queue.Full:
+            self.dropped += 1
+
+    def start(self):
+        with self.lock:
+            if self.pid == os.getpid():
+                return
+            self.queue = queue.Queue(settings.TRACE_BUFFER_SIZE)
+            threading.Thread(target=self.run, name='trace-store', daemon=True).start()
+            self.pid = os.getpid()
+
+    def run(self):
+        while True:
+            batch = [self.queue.get()]
+            batch.extend(self.drain(STORE_BATCH_SIZE - 1))
+            self.write(batch)
+
+    def drain(self, limit):
+        entries = []
+        while len(entries) < limit:
+            try:
+                entries.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return entries
+
+    def flush(self):
+        """
+        Write the spans still buffered, at exit
+        """
+        if self.pid == os.getpid():
+            while batch := self.drain(STORE_BATCH_SIZE):
+                self.write(batch)
+
+    def write(self, batch):
+        try:
+            pipe = get_redis().pipeline(transaction=False)
+            for entry in batch:
+                key = TRACE_KEY.format(entry['review_id'])
+                pipe.rpush(key, json.dumps(entry, default=str))
+                pipe.expire(key, settings.TRACE_RETENTION)
+            pipe.execute()
+        except RedisError as e:
+            logger.warning(f"Failed to store {len(batch)} spans: {e}")
+
+
+_store = SpanStore()
+
+
+def export_span(trace, name, start, end, span_id, parent_id, status='ok', **attributes):
+    """
+    Queue the span for storage under its review, for the admin endpoint,
+    and hand it to the exporter configured for the reviews.trace logger
+    """
+    entry = {
+        'trace_id': trace['trace_id'],
+        'span_id': span_id,
+        'parent_id': parent_id,
+        'review_id': trace.get('review_id'),
+        'name': name,
+        'start': start,
+        'duration_ms': round((end - start) * 1000, 3),
+        'status': status,
+        'attributes': attributes,
+    }
+    span_logger.info(name, extra={'span': entry})
+    if entry['review_id'] is not None:
+        _store.put(entry)
+
+
+def get_review_trace(review_id):
+    """
+    Spans recorded for a review ordered by start time, empty when it was not
+    traced or the trace expired. Raises RedisError when Redis is unavailable.
+    """
+    raw = get_redis().lrange(TRACE_KEY.format(review_id), 0, -1)
+    return sorted((json.loads(item) for item in raw), key=lambda entry: entry['start'])
@@ -0,0 +1,100 @@
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+from reviews.models import Review, ModerationResult, UserDeletionJob
+
+logger = logging.getLogger(__name__)
+
+
+def start_user_deletion(user):
+    """
+    Deactivate the user right away and create a job that removes their data
+    in the background. A pending or running job of the user is reused.
+    Returns the UserDeletionJob.
+    """
+    with transaction.atomic():
+        # Serializes repeated requests for the same user
+        User.objects.select_for_update().filter(id=user.id).update(is_active=False)
+        job = UserDeletionJob.objects.filter(user_id=user.id, status__in=['pending', 'running']).first()
+        if job is not None:
+            return job
+        job = UserDeletionJob.objects.create(
+            user_id=user.id,
+            username=user.username,
+            reviews_total=Review.objects.filter(user_id=user.id).count(),
+        )
+        # A failed publish must not fail the request, requeue_stale_deletions picks the job up
+        transaction.on_commit(lambda: queue_deletion(job.id), robust=True)
+    return job
+
+
+def queue_deletion(job_id):
+    from reviews.tasks import delete_user_task
+
+    delete_user_task.delay(job_id)
+
+
+def claim_deletion(job_id):
+    """
+    Move a pending job to running, False when another worker already claimed it
+    """
+    return bool(UserDeletionJob.objects.filter(id=job_id, status='pending').update(status='running'))
+
+
+def requeue_stale_deletions(age=None):
+    """
+    Queue again the jobs still pending age seconds after they were created,
+    their task was never published or was lost. Returns the job IDs queued.
+    """
+    age = age if age is not None else settings.USER_DELETION_STALE_SECONDS
+    cutoff = timezone.now() - timedelta(seconds=age)
+    job_ids = list(
+        UserDeletionJob.objects.filter(status='pending', created_at__lt=cutoff).values_list('id', flat=True)
+    )
+    for job_id in job_ids:
+        try:
+            queue_deletion(job_id)
+        except Exception as e:
+            logger.error(f"Failed to queue user deletion job {job_id} again: {e}")
+            break
+    if job_ids:
+        logger.warning(f"Queued {len(job_ids)} stale user deletion jobs again")
+    return job_ids
+
+
+def run_user_deletion(job, batch_size=None):
+    """
+    Delete the job's user in bounded batches, reviews and their dependent
+    rows first, then the user row itself. Progress is saved after every
+    batch so the job can be polled while it runs.
+    """
+    batch_size = batch_size or settings.USER_DELETION_BATCH_SIZE
+    job.status = 'running'
+    job.save(update_fields=['status'])
+
+    try:
+        while True:
+            review_ids = list(
+                Review.objects.filter(user_id=job.user_id).values_list('id', flat=True)[:batch_size]
+            )
+            if not review_ids:
+                break
+            with transaction.atomic():
+                ModerationResult.objects.filter(review_id__in=review_ids).delete()
+                Review.objects.filter(id__in=review_ids).delete()
+                job.reviews_deleted += len(review_ids)
+                job.save(update_fields=['reviews_deleted'])
+
+        User.objects.filter(id=job.user_id).delete()
+        job.status = 'completed'
+    except Exception as e:
+        logger.error(f"User deletion job {job.id} failed: {e}")
+        job.status = 'failed'
+        job.error_message = str(e)
+
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'error_message', 'finished_at'])
+    return job
@@ -0,0 +1,82 @@
+"""
+Signal receivers keeping the precomputed counters in step with writes
+"""
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from .models import Review, ModerationResult, AIServiceError
+from .services import counters
+from .services.products import bump_product, product_deltas, transition_products
+
+
+def review_product(result):
+    """
+    (product_id, rating) of the review a moderation result belongs to
+    """
+    if ModerationResult.review.is_cached(result):
+        return result.review.product_id, result.review.rating
+    review = Review.objects.filter(pk=result.review_id).values('product_id', 'rating').first()
+    return (review['product_id'], review['rating']) if review else (None, None)
+
+
+@receiver(post_save, sender=Review)
+def count_review_created(sender, instance, created, **kwargs):
+    if created:
+        deltas = counters.review_contribution()
+        deltas[counters.TOTAL] = 1
+        counters.bump(deltas)
+        if instance.product_id is not None:
+            bump_product(instance.product_id, {
+                **product_deltas(counters.review_contribution(), instance.rating), 'review_count': 1,
+            })
+
+
+@receiver(post_delete, sender=Review)
+def count_review_deleted(sender, instance, **kwargs):
+    # Its moderation result is deleted first, so the review counts as unmoderated here
+    deltas = {name: -delta for name, delta in counters.review_contribution().items()}
+    deltas[counters.TOTAL] = -1
+    counters.bump(deltas)
+    if instance.product_id is not None:
+        product = product_deltas(counters.review_contribution(), instance.rating)
+        bump_product(instance.product_id, {
+            **{field: -delta for field, delta in product.items()}, 'review_count': -1,
+        })
+
+
+@receiver(pre_save, sender=ModerationResult)
+def remember_previous_verdict(sender, instance, **kwargs):
+    previous = None
+    if instance.pk:
+        previous = ModerationResult.objects.filter(pk=instance.pk).values('flagged', 'is_spam').first()
+    instance._previous_verdict = previous
+
+
+@receiver(post_save, sender=ModerationResult)
+def count_verdict_saved(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_previous_verdict', None)
+    if created or previous is None:
+        before = counters.review_contribution()
+    else:
+        before = counters.review_contribution(previous['flagged'], previous['is_spam'])
+    after = counters.review_contribution(instance.flagged, instance.is_spam)
+    counters.bump(counters.transition(before, after))
+    transition_products([(*review_product(instance), before, after)])
+
+
+@receiver(post_delete, sender=ModerationResult)
+def count_verdict_deleted(sender, instance, **kwargs):
+    before = counters.review_contribution(instance.flagged, instance.is_spam)
+    after = counters.review_contribution()
+    counters.bump(counters.transition(before, after))
+    transition_products([(*review_product(instance), before, after)])
+
+
+@receiver(post_save, sender=AIServiceError)
+def count_error_created(sender, instance, created, **kwargs):
+    if created:
+        counters.bump({counters.ERRORS_TOTAL: 1, counters.errors_counter(instance.service): 1})
+
+
+@receiver(post_delete, sender=AIServiceError)
+def count_error_deleted(sender, instance, **kwargs):
+    counters.bump({counters.ERRORS_TOTAL: -1, counters.errors_counter(instance.service): -1})
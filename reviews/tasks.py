@@ -1,12 +1,105 @@
+import time
 from celery import shared_task
-from .models import Review
+from reviews_project.celery import app as celery_app  # noqa: F401 - sending tasks needs the configured app
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from .models import Review, ModerationResult, UserDeletionJob, AnalyticsSnapshot
+from .log import log_context
+from .services.locks import moderation_lock
 from .services.moderation import moderate_review, save_moderation_result
+from .services.retries import needs_retry, record_failure, resolve_failure, retry_pending, sweep_overdue_retries
+from .services.user_deletion import claim_deletion, requeue_stale_deletions, run_user_deletion
+from .services.analytics import run_snapshot
+from .services.tokens import prune_tokens
+from .services.deferred_checks import run_deferred_checks
+from .services.tracing import continue_trace, record_span, span
+
+@shared_task(bind=True, max_retries=3)
+def moderate_review_task(self, review_id):
+    # Trace started by the request that created the review, see celery_headers
+    carrier = getattr(self.request, 'trace', None) or (self.request.headers or {}).get('trace')
+    with continue_trace(carrier):
+        if carrier and self.request.retries == 0:
+            record_span(carrier, 'celery.queue', carrier['published_at'], time.time())
+        with span('moderation.task', retries=self.request.retries):
+            _moderate_review(self, review_id)
+
+
+def _moderate_review(task, review_id):
+    with log_context(review_id=review_id), moderation_lock(review_id) as acquired:
+        if not acquired:
+            # Another worker or an inline request is moderating this review,
+            # check back later in case it never finishes
+            raise task.retry(countdown=settings.MODERATION_LOCK_TIMEOUT)
+        try:
+            review = Review.objects.get(id=review_id)
+        except Review.DoesNotExist:
+            return
+        moderated = ModerationResult.objects.filter(review_id=review_id).values_list('moderated_text', flat=True)
+        if review.text in moderated:
+            # Redelivered or retried task, the current text is already moderated.
+            # A verdict for an older text means the review was edited meanwhile.
+            return
+        if retry_pending(review_id):
+            # A copy of a retry scheduled for later, running it would count an extra attempt
+            return
+        result = moderate_review(review.text, user_id=review.user_id)
+        if needs_retry(result):
+            # An external service failed, schedule a retry instead of saving a "clean" verdict
+            record_failure(review, result)
+            return
+        with transaction.atomic():
+            save_moderation_result(review, result)
+            resolve_failure(review)
+
+
+@shared_task
+def delete_user_task(job_id):
+    # Requeued jobs can be delivered more than once, only one delivery runs the job
+    if not claim_deletion(job_id):
+        return
+    run_user_deletion(UserDeletionJob.objects.get(id=job_id))
+
+
+@shared_task
+def sweep_user_deletions_task():
+    requeue_stale_deletions()
+
 
 @shared_task
-def moderate_review_task(review_id):
+def analytics_snapshot_task(snapshot_id):
     try:
-        review = Review.objects.get(id=review_id)
-        result = moderate_review(review.text)
-        save_moderation_result(review, result)
-    except Review.DoesNotExist:
-        pass 
\ No newline at end of file
+        snapshot = AnalyticsSnapshot.objects.get(id=snapshot_id)
+    except AnalyticsSnapshot.DoesNotExist:
+        return
+    if snapshot.status != 'pending':
+        return
+    run_snapshot(snapshot)
+
+
+
+@shared_task
+def update_last_login_task(user_id, login_time):
+    login_time = parse_datetime(login_time)
+    # Never move last_login backwards when coalesced updates arrive out of order
+    User.objects.filter(pk=user_id).filter(
+        Q(last_login__isnull=True) | Q(last_login__lt=login_time)
+    ).update(last_login=login_time)
+
+
+@shared_task
+def prune_tokens_task():
+    prune_tokens()
+
+
+@shared_task
+def sweep_retries_task():
+    sweep_overdue_retries()
+
+
+@shared_task
+def deferred_checks_task():
+    run_deferred_checks()
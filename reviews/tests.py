@@ -1,3 +1,459 @@
-from django.test import TestCase
+import json
+import tempfile
+from datetime import timedelta
+from unittest import mock
+import fakeredis
+from asgiref.sync import async_to_sync, sync_to_async
+from fakeredis import aioredis as fake_aioredis
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from redis.asyncio.client import PubSub
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.lock import Lock
+from reviews.models import (Product, Review, ModerationResult, ModerationFailure, ModerationOutbox, UserDeletionJob,
+                            UserReputation)
+from reviews.services import counters, redis_client
+from reviews.tokens import RedisRefreshToken
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import RefreshToken
+from reviews.services.deferred_checks import run_deferred_checks
+from reviews.services.editing import edit_review
+from reviews.services.events import VERDICT_CHANNEL, verdict_event, verdict_stream
+from reviews.services.moderation import save_moderation_result, safe_openai_result, safe_spam_result
+from reviews.services.overrides import apply_overrides
+from reviews.services.products import compute_product_stats
+from reviews.services.retention import archive_moderation_scores
+from reviews.services.retries import needs_retry, record_failure, sweep_overdue_retries
+from reviews.services.rethreshold import rethreshold, apply_chunk
+from reviews.services.user_deletion import requeue_stale_deletions, run_user_deletion
+from reviews.tasks import delete_user_task, moderate_review_task
 
-# Create your tests here.
+
+def verdict(flagged=False, is_spam=False, policy='full'):
+    """
+    Combined moderation result as returned by moderate_review
+    """
+    openai_result = safe_openai_result()
+    openai_result['results'][0]['flagged'] = flagged
+    spam_result = safe_spam_result()
+    spam_result['is_spam'] = is_spam
+    return {'openai_moderation': openai_result, 'spam_detection': spam_result, 'policy': policy}
+
+
+def degraded(flagged=False):
+    """
+    Result of a run where an external service failed
+    """
+    result = verdict(flagged=flagged)
+    result.update({'degraded': True, 'errors': ['OpenAI moderation timed out']})
+    return result
+
+
+def openai_response(flagged):
+    response = mock.Mock()
+    response.json.return_value = {'results': [{'flagged': flagged, 'categories': {}, 'category_scores': {}}]}
+    return response
+
+
+@override_settings(TRACE_SAMPLE_RATE=0)
+class RedisTestCase(TestCase):
+    """
+    Runs against an in-memory Redis. Lock releases are Lua scripts, which
+    fakeredis does not run, so they are replaced by a plain DELETE.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.redis = fakeredis.FakeRedis()
+        for patcher in (
+            mock.patch.object(redis_client, '_client', self.redis),
+            mock.patch.object(Lock, 'do_release', lambda lock, token: lock.redis.delete(lock.name)),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.user = User.objects.create_user(username='author', password='secret-pass-1')
+        self.admin = User.objects.create_superuser(username='admin', password='secret-pass-1')
+
+
+@override_settings(MODERATION_PIPELINE=['trust', 'openai'])
+class DeferredChecksTests(RedisTestCase):
+
+    def test_skipped_review_is_checked_later(self):
+        review = Review.objects.create(user=self.user, text='buy cheap watches')
+        save_moderation_result(review, verdict(policy='trusted_skip'))
+
+        with mock.patch('requests.post', return_value=openai_response(flagged=True)):
+            self.assertEqual(run_deferred_checks(), 1)
+
+        result = ModerationResult.objects.get(review=review)
+        self.assertEqual((result.policy, result.flagged), ('deferred', True))
+        self.assertEqual(UserReputation.objects.get(user=self.user).flagged_count, 1)
+
+    def test_overridden_review_keeps_the_moderators_verdict(self):
+        review = Review.objects.create(user=self.user, text='perfectly fine review')
+        save_moderation_result(review, verdict(policy='trusted_skip'))
+        apply_overrides(self.admin, review_ids=[review.id], flagged=True, reason='abusive')
+
+        with mock.patch('requests.post', return_value=openai_response(flagged=False)) as post:
+            self.assertEqual(run_deferred_checks(), 0)
+
+        post.assert_not_called()
+        result = ModerationResult.objects.get(review=review)
+        self.assertEqual((result.policy, result.flagged), ('trusted_skip', True))
+
+
+class ReviewEditTests(RedisTestCase):
+    TEXT = "solid kettle that boils water quickly and quietly every single morning without fuss"
+
+    def setUp(self):
+        super().setUp()
+        self.review = Review.objects.create(user=self.user, text=self.TEXT)
+        save_moderation_result(self.review, verdict())
+
+    def test_cosmetic_edit_keeps_the_verdict(self):
+        edit = edit_review(self.review, self.TEXT.replace('quickly', 'fast'))
+
+        self.assertFalse(edit.remoderated)
+        self.assertTrue(ModerationResult.objects.filter(review=self.review).exists())
+        self.assertFalse(ModerationOutbox.objects.filter(review=self.review).exists())
+
+    def test_material_edit_is_moderated_again(self):
+        edit = edit_review(self.review, "visit my shop for cheap replica watches and bags today")
+
+        self.assertTrue(edit.remoderated)
+        self.assertFalse(ModerationResult.objects.filter(review=self.review).exists())
+        self.assertTrue(ModerationOutbox.objects.filter(review=self.review).exists())
+
+    def test_small_edits_add_up_against_the_moderated_text(self):
+        words = self.TEXT.split()
+        remoderated = []
+        for i in range(len(words)):
+            words[i] = f"replaced{i}"
+            remoderated.append(edit_review(self.review, ' '.join(words)).remoderated)
+        self.assertTrue(any(remoderated))
+
+    def test_abusive_edit_counts_against_the_author(self):
+        edit_review(self.review, "you are all idiots and this shop is run by criminals")
+        self.review.refresh_from_db()
+        save_moderation_result(self.review, verdict(flagged=True))
+
+        reputation = UserReputation.objects.get(user=self.user)
+        self.assertEqual((reputation.checked_count, reputation.flagged_count), (1, 1))
+
+    def test_repeated_edits_do_not_farm_trust(self):
+        for i in range(3):
+            edit_review(self.review, f"completely different text number {i} about another kettle brand")
+            self.review.refresh_from_db()
+            save_moderation_result(self.review, verdict())
+
+        self.assertEqual(UserReputation.objects.get(user=self.user).checked_count, 1)
+
+
+@override_settings(SSE_MAX_DURATION=2, SSE_KEEPALIVE_INTERVAL=60)
+class VerdictStreamTests(RedisTestCase):
+
+    def test_verdict_saved_while_subscribing_is_sent_once(self):
+        review = Review.objects.create(user=self.user, text='nice mug')
+        server = fakeredis.FakeServer()
+        publisher = fakeredis.FakeRedis(server=server)
+
+        def save_and_publish():
+            result = save_moderation_result(review, verdict())
+            publisher.publish(VERDICT_CHANNEL.format(self.user.id), json.dumps(verdict_event(result)))
+
+        async def subscribed(pubsub, *channels):
+            # The verdict lands right after the stream subscribed,
+            # before it reads the existing verdict
+            await original_subscribe(pubsub, *channels)
+            await sync_to_async(save_and_publish)()
+
+        async def collect():
+            events = []
+            async for chunk in verdict_stream(self.user.id, review.id):
+                events.append(chunk)
+            return events
+
+        client = fake_aioredis.FakeRedis(server=server)
+        original_subscribe = PubSub.subscribe
+        with mock.patch('redis.asyncio.Redis.from_url', return_value=client), \
+                mock.patch.object(PubSub, 'subscribe', subscribed):
+            events = async_to_sync(collect)()
+
+        self.assertEqual(len([chunk for chunk in events if chunk.startswith('event: verdict')]), 1)
+
+
+class ScoreArchivalTests(RedisTestCase):
+
+    def test_archival_keeps_the_verdict_version_and_categories(self):
+        review = Review.objects.create(user=self.user, text='rude words')
+        result = save_moderation_result(review, verdict(flagged=True))
+        ModerationResult.objects.filter(pk=result.pk).update(
+            categories={'harassment': True}, category_scores={'harassment': 0.93},
+            created_at=timezone.now() - timedelta(days=60),
+        )
+        result.refresh_from_db()
+
+        with tempfile.TemporaryDirectory() as archive_dir, override_settings(ARCHIVE_DIR=archive_dir):
+            archived, _ = archive_moderation_scores(days=30)
+
+        archived_result = ModerationResult.objects.get(pk=result.pk)
+        self.assertEqual(archived, 1)
+        self.assertEqual(archived_result.category_scores, {})
+        self.assertEqual(archived_result.categories, {'harassment': True})
+        self.assertEqual(archived_result.updated_at, result.updated_at)
+        self.assertIsNotNone(archived_result.scores_archived_at)
+
+
+class RethresholdTests(RedisTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.review = Review.objects.create(user=self.user, text='borderline remark')
+        self.result = save_moderation_result(self.review, verdict())
+        ModerationResult.objects.filter(pk=self.result.pk).update(
+            categories={'harassment': False}, category_scores={'harassment': 0.4},
+        )
+
+    def test_lower_threshold_flags_and_counts(self):
+        summary = rethreshold({'harassment': 0.3}, apply=True)
+
+        self.assertEqual((summary['newly_flagged'], summary['written']), (1, 1))
+        result = ModerationResult.objects.get(pk=self.result.pk)
+        self.assertTrue(result.flagged)
+        self.assertEqual(result.categories, {'harassment': True})
+        self.assertEqual(counters.get_counter(counters.FLAGGED), 1)
+        self.assertEqual(counters.get_counter(counters.VISIBLE), 0)
+        self.assertEqual(UserReputation.objects.get(user=self.user).flagged_count, 1)
+
+    def test_dry_run_changes_nothing(self):
+        summary = rethreshold({'harassment': 0.3})
+
+        self.assertEqual((summary['newly_flagged'], summary['written']), (1, 0))
+        self.assertFalse(ModerationResult.objects.get(pk=self.result.pk).flagged)
+
+    def test_result_changed_meanwhile_is_left_alone(self):
+        stale_row = ModerationResult.objects.filter(pk=self.result.pk).values_list(
+            'id', 'flagged', 'is_spam', 'categories', 'category_scores', 'review__product_id', 'review__rating',
+            'review__user_id', 'policy', 'updated_at',
+        ).get()
+        # A concurrent override lands between the read and the write
+        apply_overrides(self.admin, review_ids=[self.review.id], is_spam=True, reason='spam')
+
+        self.assertEqual(apply_chunk([stale_row], [True], [[True]], ['harassment']), 0)
+        result = ModerationResult.objects.get(pk=self.result.pk)
+        self.assertEqual((result.flagged, result.is_spam), (False, True))
+        self.assertEqual(counters.get_counter(counters.FLAGGED), 0)
+
+
+class RefreshTokenTests(RedisTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+
+    def refresh(self, token):
+        return self.client.post('/api/token/refresh/', {'refresh': str(token)}, format='json')
+
+    def test_rotated_token_cannot_be_reused(self):
+        token = RedisRefreshToken.for_user(self.user)
+
+        first = self.refresh(token)
+        self.assertEqual(first.status_code, 200)
+        self.assertNotEqual(first.json()['refresh'], str(token))
+        self.assertEqual(self.refresh(token).status_code, 401)
+        self.assertEqual(self.refresh(first.json()['refresh']).status_code, 200)
+
+    def test_concurrent_rotation_only_succeeds_once(self):
+        token = RedisRefreshToken.for_user(self.user)
+        first, second = RedisRefreshToken(str(token)), RedisRefreshToken(str(token))
+
+        first.blacklist()
+        with self.assertRaises(TokenError):
+            second.blacklist()
+
+    def test_database_blacklist_is_checked_within_a_token_lifetime(self):
+        token = RefreshToken.for_user(self.user)
+        token.blacklist()
+
+        with override_settings(TOKEN_BLACKLIST_REDIS_SINCE=timezone.now() - timedelta(days=1)):
+            self.assertEqual(self.refresh(token).status_code, 401)
+        with override_settings(TOKEN_BLACKLIST_REDIS_SINCE=None):
+            self.assertEqual(self.refresh(token).status_code, 200)
+
+
+class CounterTests(RedisTestCase):
+    """
+    The incrementally maintained counters and product aggregates must match
+    a count from scratch after every kind of write
+    """
+    REVIEW_COUNTERS = [counters.TOTAL, counters.VISIBLE, counters.PENDING, counters.FLAGGED, counters.SPAM]
+
+    def setUp(self):
+        super().setUp()
+        self.product = Product.objects.create(name='Kettle')
+
+    def assertCountsMatch(self):
+        expected = counters.compute_counts()
+        self.assertEqual(
+            {name: counters.get_counter(name) or 0 for name in self.REVIEW_COUNTERS},
+            {name: expected[name] for name in self.REVIEW_COUNTERS},
+        )
+        product = Product.objects.values(*compute_product_stats(self.product)).get(pk=self.product.pk)
+        self.assertEqual(product, compute_product_stats(self.product))
+
+    def test_counts_follow_create_moderate_override_and_delete(self):
+        good = Review.objects.create(user=self.user, product=self.product, rating=5, text='works well')
+        bad = Review.objects.create(user=self.user, product=self.product, rating=1, text='rubbish, buy elsewhere')
+        self.assertCountsMatch()
+        self.assertEqual(counters.get_counter(counters.PENDING), 2)
+
+        save_moderation_result(good, verdict())
+        save_moderation_result(bad, verdict(flagged=True))
+        self.assertCountsMatch()
+        self.assertEqual(counters.get_counter(counters.FLAGGED), 1)
+
+        apply_overrides(self.admin, review_ids=[bad.id], flagged=False, is_spam=True)
+        self.assertCountsMatch()
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.flagged_count, self.product.spam_count, self.product.rating_1_count), (0, 1, 0))
+
+        good.delete()
+        self.assertCountsMatch()
+        self.assertEqual(counters.get_counter(counters.TOTAL), 1)
+
+    def test_user_deletion_removes_their_contribution(self):
+        other = User.objects.create_user(username='other', password='secret-pass-1')
+        kept = Review.objects.create(user=other, product=self.product, rating=4, text='fine')
+        save_moderation_result(kept, verdict())
+        for rating in (2, 3):
+            review = Review.objects.create(user=self.user, product=self.product, rating=rating, text='meh')
+            save_moderation_result(review, verdict(is_spam=rating == 2))
+
+        job = UserDeletionJob.objects.create(user_id=self.user.id, username=self.user.username, reviews_total=2)
+        run_user_deletion(job, batch_size=1)
+
+        self.assertEqual(job.status, 'completed')
+        self.assertCountsMatch()
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.review_count, self.product.visible_count), (1, 1))
+
+
+class RetryTests(RedisTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.review = Review.objects.create(user=self.user, text='a review to check')
+
+    def test_only_degraded_clean_results_are_retried(self):
+        self.assertTrue(needs_retry(degraded()))
+        self.assertFalse(needs_retry(degraded(flagged=True)))
+        self.assertFalse(needs_retry(verdict()))
+
+    @override_settings(MODERATION_RETRY_BASE_DELAY=30)
+    def test_failure_schedules_a_retry_with_backoff(self):
+        with mock.patch.object(moderate_review_task, 'apply_async') as apply_async:
+            with self.captureOnCommitCallbacks(execute=True):
+                failure = record_failure(self.review, degraded())
+
+        self.assertEqual((failure.status, failure.attempts), ('retrying', 1))
+        self.assertIn('timed out', failure.last_error)
+        self.assertGreater(failure.next_attempt_at, timezone.now())
+        apply_async.assert_called_once()
+        self.assertEqual(apply_async.call_args.args, ((self.review.id,),))
+        self.assertTrue(15 <= apply_async.call_args.kwargs['countdown'] <= 30)
+
+    @override_settings(MODERATION_MAX_ATTEMPTS=2)
+    def test_last_attempt_moves_the_review_to_dead_letters(self):
+        with mock.patch.object(moderate_review_task, 'apply_async') as apply_async:
+            with self.captureOnCommitCallbacks(execute=True):
+                record_failure(self.review, degraded())
+            with self.captureOnCommitCallbacks(execute=True):
+                failure = record_failure(self.review, degraded())
+
+        self.assertEqual((failure.status, failure.attempts, failure.next_attempt_at), ('dead', 2, None))
+        self.assertEqual(apply_async.call_count, 1)
+
+    def test_degraded_run_is_not_saved_as_clean(self):
+        with mock.patch('reviews.tasks.moderate_review', return_value=degraded()), \
+                mock.patch.object(moderate_review_task, 'apply_async'):
+            moderate_review_task(self.review.id)
+
+        self.assertFalse(ModerationResult.objects.filter(review=self.review).exists())
+        self.assertEqual(ModerationFailure.objects.get(review=self.review).attempts, 1)
+
+    def test_overdue_retries_are_queued_through_the_outbox(self):
+        with mock.patch.object(moderate_review_task, 'apply_async'):
+            record_failure(self.review, degraded())
+        ModerationFailure.objects.update(next_attempt_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(sweep_overdue_retries(grace=60), [self.review.id])
+        self.assertTrue(ModerationOutbox.objects.filter(review=self.review).exists())
+        self.assertIsNone(ModerationFailure.objects.get(review=self.review).next_attempt_at)
+        self.assertEqual(sweep_overdue_retries(grace=60), [])
+
+
+class UserDeletionTests(RedisTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def delete_user(self):
+        return self.client.delete(f'/api/admin/users/{self.user.id}/delete/')
+
+    def test_repeated_delete_reuses_the_pending_job(self):
+        with mock.patch.object(delete_user_task, 'delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                first = self.delete_user()
+            with self.captureOnCommitCallbacks(execute=True):
+                second = self.delete_user()
+
+        self.assertEqual((first.status_code, second.status_code), (202, 202))
+        self.assertEqual(first.json()['id'], second.json()['id'])
+        self.assertEqual(UserDeletionJob.objects.count(), 1)
+        delay.assert_called_once()
+
+    def test_broker_failure_leaves_the_job_for_the_sweep(self):
+        with mock.patch.object(delete_user_task, 'delay', side_effect=ConnectionError('broker down')):
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.delete_user()
+
+        self.assertEqual(response.status_code, 202)
+        job = UserDeletionJob.objects.get()
+        self.assertEqual(job.status, 'pending')
+        self.assertFalse(User.objects.get(id=self.user.id).is_active)
+
+        UserDeletionJob.objects.filter(id=job.id).update(created_at=timezone.now() - timedelta(hours=1))
+        with mock.patch.object(delete_user_task, 'delay') as delay:
+            self.assertEqual(requeue_stale_deletions(age=60), [job.id])
+        delay.assert_called_once_with(job.id)
+
+    def test_duplicate_delivery_runs_the_job_once(self):
+        Review.objects.create(user=self.user, text='to be removed')
+        with mock.patch.object(delete_user_task, 'delay'):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.delete_user()
+        job = UserDeletionJob.objects.get()
+
+        with mock.patch('reviews.tasks.run_user_deletion') as run:
+            delete_user_task(job.id)
+            delete_user_task(job.id)
+        run.assert_called_once()
+
+
+class ReviewTraceTests(RedisTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_unavailable_trace_store_returns_503(self):
+        with mock.patch.object(self.redis, 'lrange', side_effect=RedisConnectionError('down')):
+            response = self.client.get('/api/admin/reviews/1/trace/')
+
+        self.assertEqual(response.status_code, 503)
+        self.assertIn('error', response.json())
@@ -0,0 +1,42 @@
+"""
+Refresh tokens revoked through Redis instead of simplejwt's database tables
+"""
+from django.utils.translation import gettext_lazy as _
+from redis.exceptions import RedisError
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken, Token
+from .services.tokens import blacklist_jti, is_blacklisted
+
+
+class RedisRefreshToken(RefreshToken):
+    """
+    Refresh token whose revoked IDs live in Redis with a TTL matching the
+    token's remaining lifetime, issuing and rotating it writes no database rows
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        # Skip BlacklistMixin.for_user, which records an OutstandingToken row
+        return Token.for_user.__func__(cls, user)
+
+    def check_blacklist(self):
+        try:
+            blacklisted = is_blacklisted(self.payload[api_settings.JTI_CLAIM])
+        except RedisError:
+            # Without the blacklist a rotated token could be replayed, fail closed
+            raise TokenError(_("Token blacklist unavailable"))
+        if blacklisted:
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        try:
+            revoked = blacklist_jti(self.payload[api_settings.JTI_CLAIM], self.payload['exp'])
+        except RedisError:
+            raise TokenError(_("Token blacklist unavailable"))
+        if not revoked:
+            # A concurrent refresh rotated this token after our check_blacklist
+            raise TokenError(_("Token is blacklisted"))
+
+    def outstand(self):
+        return None
@@ -1,16 +1,36 @@
 from django.urls import path
 from .views import (RegisterView, LoginView, UserListView, UserDeleteView, ReviewListView,
                     AdminReviewsWithModerationView, ReviewDetailView, AIServiceErrorListView,
-                    AIServiceErrorDetailView)
+                    AIServiceErrorDetailView, UserDeletionJobDetailView, MyReviewListView,
+                    AdminUserReviewListView, ModerationPolicyStatsView, ModerationPipelineStatsView,
+                    ReviewVerdictStreamView, BulkModerationOverrideView, AnalyticsSnapshotListView,
+                    ReviewEditListView, ModerationFailureListView, ModerationFailureRequeueView,
+                    ProductListView, ProductDetailView, ProductReviewListView, AdminReviewTraceView)
 
 urlpatterns = [
     path('register/', RegisterView.as_view(), name='register'),
     path('login/', LoginView.as_view(), name='login'),
     path('admin/users/', UserListView.as_view(), name='user-list'),
     path('admin/users/<int:user_id>/delete/', UserDeleteView.as_view(), name='user-delete'),
+    path('admin/users/<int:user_id>/reviews/', AdminUserReviewListView.as_view(), name='admin-user-reviews'),
+    path('admin/users/deletion-jobs/<int:job_id>/', UserDeletionJobDetailView.as_view(), name='user-deletion-job'),
+    path('products/', ProductListView.as_view(), name='products'),
+    path('products/<int:product_id>/', ProductDetailView.as_view(), name='product-detail'),
+    path('products/<int:product_id>/reviews/', ProductReviewListView.as_view(), name='product-reviews'),
     path('reviews/', ReviewListView.as_view(), name='reviews'),
+    path('reviews/events/', ReviewVerdictStreamView.as_view(), name='review-events'),
+    path('reviews/mine/', MyReviewListView.as_view(), name='my-reviews'),
     path('reviews/<int:review_id>/', ReviewDetailView.as_view(), name='review-detail'),
+    path('reviews/<int:review_id>/edits/', ReviewEditListView.as_view(), name='review-edits'),
     path('admin/reviews/', AdminReviewsWithModerationView.as_view(), name='admin-reviews-moderation'),
+    path('admin/reviews/<int:review_id>/trace/', AdminReviewTraceView.as_view(), name='admin-review-trace'),
+    path('admin/moderation/overrides/', BulkModerationOverrideView.as_view(), name='admin-moderation-overrides'),
+    path('admin/moderation/failures/', ModerationFailureListView.as_view(), name='admin-moderation-failures'),
+    path('admin/moderation/failures/requeue/', ModerationFailureRequeueView.as_view(),
+         name='admin-moderation-failures-requeue'),
+    path('admin/moderation/policy-stats/', ModerationPolicyStatsView.as_view(), name='admin-moderation-policy-stats'),
+    path('admin/moderation/pipeline-stats/', ModerationPipelineStatsView.as_view(), name='admin-moderation-pipeline-stats'),
+    path('admin/analytics/snapshots/', AnalyticsSnapshotListView.as_view(), name='admin-analytics-snapshots'),
     path('admin/errors/', AIServiceErrorListView.as_view(), name='admin-ai-errors'),
     path('admin/errors/<int:error_id>/', AIServiceErrorDetailView.as_view(), name='admin-ai-error-detail'),
 ]
@@ -2,6 +2,9 @@
 Utility functions for the reviews app
 """
 from .models import AIServiceError
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+import hashlib
 import logging
 
 logger = logging.getLogger(__name__)
@@ -48,8 +51,9 @@ def log_ai_error(service, input_text, error, status_code=None):
         )
         
         logger.error(
-            f"AI Service Error - {service}: {error_message} "
-            f"(Status: {status_code}) for input: {truncated_input[:100]}..."
+            f"AI Service Error - {service}: {error_message}",
+            extra={'service': service, 'status_code': status_code, 'outcome': 'error',
+                   'input_preview': truncated_input[:100]}
         )
         
         return ai_error
@@ -78,4 +82,43 @@ def get_recent_ai_errors(service=None, limit=10):
     if service:
         queryset = queryset.filter(service=service)
     
-    return queryset[:limit] 
\ No newline at end of file
+    return queryset[:limit]
+
+
+def make_etag(*parts):
+    """
+    Build a strong ETag from the values a response body is derived from.
+    """
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def set_cache_validators(response, etag, last_modified=None):
+    """
+    Attach ETag, Last-Modified and Cache-Control headers to a response.
+    Responses are per-user, so shared caches must not store them and
+    clients revalidate on every use.
+    """
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ['Authorization'])
+    return response
+
+
+def conditional_response(request, etag, last_modified=None):
+    """
+    Evaluate If-None-Match / If-Modified-Since before any serialization.
+    Returns a 304 (or 412) response when the preconditions decide the
+    request, otherwise None so the view goes on to render the body.
+    """
+    response = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=int(last_modified.timestamp()) if last_modified else None,
+    )
+    if response is not None:
+        set_cache_validators(response, etag, last_modified)
+    return response
+
@@ -2,59 +2,124 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, generics
 from .serializers import (RegisterSerializer, LoginSerializer, ReviewSerializer, 
-                         ReviewCreateSerializer, AdminReviewWithModerationSerializer,
-                         AIServiceErrorSerializer)
+                         ReviewCreateSerializer, ReviewUpdateSerializer, AdminReviewWithModerationSerializer,
+                         AIServiceErrorSerializer, UserDeletionJobSerializer, ReviewFeedSerializer,
+                         BulkModerationOverrideSerializer, AnalyticsSnapshotSerializer, ReviewEditSerializer,
+                         ModerationFailureSerializer, RequeueModerationFailuresSerializer, ProductSerializer,
+                         admin_review_rows, serialize_admin_review_rows)
 from django.contrib.auth import authenticate
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from drf_spectacular.openapi import OpenApiTypes
-from rest_framework_simplejwt.tokens import RefreshToken
+from .tokens import RedisRefreshToken
+from .services.tokens import record_login
 from .permissions import IsSuperUser
+from .utils import make_etag, conditional_response, set_cache_validators
 from django.contrib.auth.models import User
-from reviews.models import Review, ModerationResult, AIServiceError
+from reviews.models import Product, Review, ReviewEdit, ModerationResult, ModerationFailure, AIServiceError, UserDeletionJob, AnalyticsSnapshot
 from rest_framework.permissions import IsAuthenticated
-from .tasks import moderate_review_task
-from django.db import models
+from .services.outbox import enqueue_moderation
+from .services.metrics import stage_stats, counters
+from .pagination import UserCursorPagination, ReviewFeedCursorPagination, CountedLimitOffsetPagination
+from .services.counters import count_admin_reviews, get_counter, errors_counter, ERRORS_TOTAL
+from .db_router import ReadReplicaMixin, pin_to_primary
+from django.db import models, transaction
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views import View
+from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework_simplejwt.exceptions import TokenError
+from redis.exceptions import RedisError
+from .services.events import verdict_stream
+from .services.tracing import start_trace, span, get_review_trace
 
 
-class UserListView(APIView):
+@extend_schema(
+    operation_id="get_all_users",
+    description="Get all users, cursor-paginated (Admin only)",
+    parameters=[
+        OpenApiParameter(
+            name='include_review_counts',
+            description='Include the number of reviews per user',
+            required=False,
+            type=OpenApiTypes.STR,
+            enum=['true', 'false'],
+        ),
+    ],
+    responses={200: "Paginated list of users"},
+    tags=["Admin"]
+)
+class UserListView(generics.ListAPIView):
     """
-    Admin-only endpoint to get all users
+    Admin-only endpoint to get all users, cursor-paginated by ID
+    Optional query parameters:
+    - ?page_size=100 - number of users per page (default: 50, max: 200)
+    - ?include_review_counts=true - add each user's review count
     """
     permission_classes = [IsSuperUser]
+    pagination_class = UserCursorPagination
     
-    @extend_schema(
-        operation_id="get_all_users",
-        description="Get all users (Admin only)",
-        responses={200: "List of all users"},
-        tags=["Admin"]
-    )
-    def get(self, request):
-        users = User.objects.all().values('id', 'username', 'email', 'is_superuser', 'date_joined')
-        return Response(users)
+    def get_queryset(self):
+        queryset = User.objects.all()
+        fields = ['id', 'username', 'email', 'is_superuser', 'date_joined']
+        
+        include_counts = self.request.query_params.get('include_review_counts', '')
+        if include_counts.lower() == 'true':
+            # Counted in the page query itself with a single GROUP BY
+            queryset = queryset.annotate(review_count=models.Count('reviews'))
+            fields.append('review_count')
+        
+        return queryset.values(*fields)
+    
+    def list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(self.get_queryset())
+        return self.get_paginated_response(page)
 
 
 class UserDeleteView(APIView):
     """
     Admin-only endpoint to delete a user
+    The user is deactivated immediately and their data is removed by a background job
     """
     permission_classes = [IsSuperUser]
     
     @extend_schema(
         operation_id="delete_user",
-        description="Delete a user (Admin only)",
+        description="Schedule deletion of a user and their reviews (Admin only)",
         responses={
-            200: "User deleted successfully",
+            202: UserDeletionJobSerializer,
             404: "User not found"
         },
         tags=["Admin"]
     )
     def delete(self, request, user_id):
+        from .services.user_deletion import start_user_deletion
+        
         try:
             user = User.objects.get(id=user_id)
-            user.delete()
-            return Response({'detail': 'User deleted successfully'})
         except User.DoesNotExist:
             return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
+        job = start_user_deletion(user)
+        return Response(UserDeletionJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+
+@extend_schema(
+    operation_id="admin_get_user_deletion_job",
+    description="Get the progress of a user deletion job (Admin only)",
+    responses={
+        200: UserDeletionJobSerializer,
+        404: "Job not found"
+    },
+    tags=["Admin"]
+)
+class UserDeletionJobDetailView(generics.RetrieveAPIView):
+    """
+    Admin-only endpoint to poll the progress of a user deletion job
+    """
+    queryset = UserDeletionJob.objects.all()
+    serializer_class = UserDeletionJobSerializer
+    permission_classes = [IsSuperUser]
+    lookup_field = 'id'
+    lookup_url_kwarg = 'job_id'
 
 
 class RegisterView(APIView):
@@ -77,7 +142,7 @@ class RegisterView(APIView):
         serializer = RegisterSerializer(data=request.data)
         if serializer.is_valid():
             user = serializer.save()
-            refresh = RefreshToken.for_user(user)
+            refresh = RedisRefreshToken.for_user(user)
             return Response({
                 'refresh': str(refresh),
                 'access': str(refresh.access_token),
@@ -106,7 +171,8 @@ class LoginView(APIView):
         password = request.data.get('password')
         user = authenticate(username=username, password=password)
         if user:
-            refresh = RefreshToken.for_user(user)
+            refresh = RedisRefreshToken.for_user(user)
+            record_login(user)
             return Response({
                 'refresh': str(refresh),
                 'access': str(refresh.access_token),
@@ -114,7 +180,7 @@ class LoginView(APIView):
         return Response({'error': 'Invalid credentials'}, status=status.HTTP_400_BAD_REQUEST)
 
 
-class ReviewListView(APIView):
+class ReviewListView(ReadReplicaMixin, APIView):
     """
     Endpoint to get reviews (GET) and create new reviews (POST)
     - Regular users see all reviews except flagged ones
@@ -137,30 +203,233 @@ class ReviewListView(APIView):
                 models.Q(moderation_result__isnull=True)
             )
         
+        # Validators come from two aggregates, a matching client gets a 304 without serialization
+        summary = reviews.aggregate(
+            count=models.Count('id'), latest=models.Max('created_at'), edited=models.Max('edited_at')
+        )
+        moderated_at = ModerationResult.objects.aggregate(latest=models.Max('updated_at'))['latest']
+        last_modified = max(filter(None, [summary['latest'], summary['edited'], moderated_at]), default=None)
+        etag = make_etag(
+            'reviews', request.user.is_superuser, summary['count'], summary['latest'], summary['edited'], moderated_at
+        )
+        not_modified = conditional_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        
         serializer = ReviewSerializer(reviews, many=True)
-        return Response(serializer.data)
+        return set_cache_validators(Response(serializer.data), etag, last_modified)
     
     @extend_schema(
         operation_id="create_review",
         request=ReviewCreateSerializer,
-        description="Create a new review",
+        description="Create a new review. Use ?moderation=inline to moderate within the latency budget "
+                    "and get the verdict in the response, falling back to background moderation.",
+        parameters=[
+            OpenApiParameter(
+                name='moderation',
+                description='Moderate inline instead of in the background',
+                required=False,
+                type=OpenApiTypes.STR,
+                enum=['inline'],
+            ),
+        ],
         responses={201: ReviewCreateSerializer},
         tags=["Reviews"]
     )
     def post(self, request):
+        from .services.inline import moderate_inline
+        
         serializer = ReviewCreateSerializer(data=request.data)
-        if serializer.is_valid():
-            review = serializer.save(user=request.user)  
-            moderate_review_task.delay(review.id)
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        # The trace follows the review through the outbox and Celery, see the admin trace endpoint
+        with start_trace() as trace:
+            with span('review.create'):
+                # The outbox row commits with the review, the relay publishes it to Celery
+                with transaction.atomic():
+                    review = serializer.save(user=request.user)
+                    if trace is not None:
+                        trace['review_id'] = review.id
+                    enqueue_moderation(review)
+            pin_to_primary(request.user.id)
+            
+            if request.query_params.get('moderation') != 'inline':
+                return Response(serializer.data, status=status.HTTP_201_CREATED)
+            
+            moderation_result = moderate_inline(review)
+        
+        data = dict(serializer.data)
+        if moderation_result is None:
+            data['moderation_path'] = 'deferred'
+            data['moderation_status'] = 'pending'
+        else:
+            data['moderation_path'] = 'inline'
+            data['moderation_status'] = moderation_result.status
+        return Response(data, status=status.HTTP_201_CREATED)
+
+
+class ProductListView(ReadReplicaMixin, generics.ListCreateAPIView):
+    """
+    Endpoint to list products with their review aggregates (GET)
+    and to create products (POST, admin only)
+    - Paginated with ?limit= and ?offset=
+    """
+    queryset = Product.objects.order_by('id')
+    serializer_class = ProductSerializer
+    pagination_class = CountedLimitOffsetPagination
+    
+    def get_permissions(self):
+        if self.request.method == 'POST':
+            return [IsSuperUser()]
+        return [IsAuthenticated()]
+    
+    @extend_schema(
+        operation_id="get_products",
+        description="List products with their review counts and rating histograms",
+        tags=["Products"]
+    )
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+    
+    @extend_schema(
+        operation_id="create_product",
+        description="Create a product (Admin only)",
+        tags=["Products"]
+    )
+    def post(self, request, *args, **kwargs):
+        return super().post(request, *args, **kwargs)
+
+
+@extend_schema(
+    operation_id="get_product",
+    description="Get a product with its review counts and rating histogram",
+    responses={
+        200: ProductSerializer,
+        404: "Product not found"
+    },
+    tags=["Products"]
+)
+class ProductDetailView(ReadReplicaMixin, generics.RetrieveAPIView):
+    """
+    Authenticated endpoint to get one product, its aggregates are read from the product row
+    """
+    queryset = Product.objects.all()
+    serializer_class = ProductSerializer
+    permission_classes = [IsAuthenticated]
+    lookup_field = 'id'
+    lookup_url_kwarg = 'product_id'
+
+
+@extend_schema(
+    operation_id="get_product_reviews",
+    description="Get a product's reviews with moderation status, newest first "
+                "(non-flagged, non-spam reviews for users, all reviews for admins)",
+    responses={200: ReviewFeedSerializer(many=True)},
+    tags=["Products"]
+)
+class ProductReviewListView(ReadReplicaMixin, generics.ListAPIView):
+    """
+    Authenticated endpoint to get the reviews of one product
+    - Keyset-paginated, newest first, served by the (product, -created_at) index
+    """
+    serializer_class = ReviewFeedSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = ReviewFeedCursorPagination
+    
+    def get_queryset(self):
+        reviews = Review.objects.filter(product_id=self.kwargs['product_id'])
+        if not self.request.user.is_superuser:
+            reviews = reviews.filter(
+                models.Q(moderation_result__flagged=False, moderation_result__is_spam=False) |
+                models.Q(moderation_result__isnull=True)
+            )
+        return reviews.annotate(
+            moderation_flagged=models.F('moderation_result__flagged'),
+            moderation_spam=models.F('moderation_result__is_spam'),
+        )
+
+
+@extend_schema(
+    operation_id="get_my_reviews",
+    description="Get the authenticated user's reviews with moderation status, newest first",
+    responses={200: ReviewFeedSerializer(many=True)},
+    tags=["Reviews"]
+)
+class MyReviewListView(generics.ListAPIView):
+    """
+    Authenticated endpoint to get the current user's own reviews
+    - Keyset-paginated, newest first
+    - Includes each review's moderation status
+    """
+    serializer_class = ReviewFeedSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = ReviewFeedCursorPagination
+    
+    def get_feed_user_id(self):
+        return self.request.user.id
+    
+    def get_queryset(self):
+        # Served by the (user, -created_at) index, moderation status comes from the join
+        return Review.objects.filter(user_id=self.get_feed_user_id()).annotate(
+            moderation_flagged=models.F('moderation_result__flagged'),
+            moderation_spam=models.F('moderation_result__is_spam'),
+        )
+
+
+@extend_schema(
+    operation_id="admin_get_user_reviews",
+    description="Get a user's reviews with moderation status, newest first (Admin only)",
+    responses={200: ReviewFeedSerializer(many=True)},
+    tags=["Admin"]
+)
+class AdminUserReviewListView(MyReviewListView):
+    """
+    Admin-only endpoint to get the reviews of a specific user
+    """
+    permission_classes = [IsSuperUser]
+    
+    def get_feed_user_id(self):
+        return self.kwargs['user_id']
+
+
+class ReviewVerdictStreamView(View):
+    """
+    Server-Sent Events stream of moderation verdicts for the user's own reviews
+    - Served under ASGI, EventSource cannot send headers so the access token
+      is passed as ?token=
+    - Optional ?review_id= limits the stream to a single review
+    """
+    
+    async def get(self, request):
+        try:
+            user_id = AccessToken(request.GET.get('token', ''))[settings.SIMPLE_JWT['USER_ID_CLAIM']]
+        except (TokenError, KeyError):
+            return JsonResponse({'error': 'Invalid or missing token'}, status=401)
+        
+        review_id = request.GET.get('review_id')
+        if review_id is not None:
+            try:
+                review_id = int(review_id)
+            except ValueError:
+                return JsonResponse({'error': 'Invalid review_id'}, status=400)
+        
+        response = StreamingHttpResponse(
+            verdict_stream(user_id, review_id),
+            content_type='text/event-stream',
+        )
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
 
 
 class ReviewDetailView(generics.RetrieveAPIView):
     """
-    Authenticated endpoint to get a specific review by ID with moderation data
+    Authenticated endpoint to get a specific review by ID with moderation data (GET)
+    and to edit the text of one's own review (PATCH)
     - Requires authentication
     - Shows moderation data if available
+    - Only material edits are moderated again, minor ones keep the current verdict
     """
     queryset = Review.objects.select_related('moderation_result').all()
     serializer_class = AdminReviewWithModerationSerializer
@@ -175,7 +444,88 @@ class ReviewDetailView(generics.RetrieveAPIView):
         tags=["Reviews"]
     )
     def get(self, request, *args, **kwargs):
-        return super().get(request, *args, **kwargs)
+        validators = Review.objects.filter(id=kwargs[self.lookup_url_kwarg]).values(
+            'created_at', 'edited_at', 'moderation_result__id', 'moderation_result__updated_at',
+            'moderation_result__scores_archived_at',
+        ).first()
+        if validators is None:
+            return super().get(request, *args, **kwargs)
+        
+        last_modified = max(filter(None, [
+            validators['created_at'], validators['edited_at'], validators['moderation_result__updated_at'],
+            validators['moderation_result__scores_archived_at'],
+        ]))
+        etag = make_etag(
+            'review', kwargs[self.lookup_url_kwarg], validators['created_at'], validators['edited_at'],
+            validators['moderation_result__id'], validators['moderation_result__updated_at'],
+            validators['moderation_result__scores_archived_at'],
+        )
+        not_modified = conditional_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        
+        return set_cache_validators(super().get(request, *args, **kwargs), etag, last_modified)
+
+    @extend_schema(
+        operation_id="edit_review",
+        request=ReviewUpdateSerializer,
+        description="Edit the text of your own review. The edit is kept in the review's history and "
+                    "the review is only moderated again when the text changed materially.",
+        responses={
+            200: ReviewCreateSerializer,
+            400: "Validation errors",
+            403: "Not the author of the review",
+            404: "Review not found"
+        },
+        tags=["Reviews"]
+    )
+    def patch(self, request, *args, **kwargs):
+        from .services.editing import edit_review
+        
+        review = self.get_object()
+        if review.user_id != request.user.id:
+            return Response({'error': 'You can only edit your own reviews'}, status=status.HTTP_403_FORBIDDEN)
+        
+        serializer = ReviewUpdateSerializer(review, data=request.data, partial=True)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        edit = edit_review(review, serializer.validated_data.get('text', review.text))
+        pin_to_primary(request.user.id)
+        review.refresh_from_db()
+        data = dict(ReviewCreateSerializer(review).data)
+        data['remoderated'] = edit is not None and edit.remoderated
+        return Response(data)
+
+
+@extend_schema(
+    operation_id="get_review_edits",
+    description="Get the edit history of a review, newest first (author or admin)",
+    responses={
+        200: ReviewEditSerializer(many=True),
+        403: "Not the author of the review",
+        404: "Review not found"
+    },
+    tags=["Reviews"]
+)
+class ReviewEditListView(generics.ListAPIView):
+    """
+    Endpoint to get the edit history of a review, visible to its author and admins
+    """
+    serializer_class = ReviewEditSerializer
+    permission_classes = [IsAuthenticated]
+    
+    def list(self, request, *args, **kwargs):
+        review = Review.objects.filter(id=self.kwargs['review_id']).values('user_id').first()
+        if review is None:
+            return Response({'error': 'Review not found'}, status=status.HTTP_404_NOT_FOUND)
+        if review['user_id'] != request.user.id and not request.user.is_superuser:
+            return Response({'error': 'You can only view the history of your own reviews'},
+                            status=status.HTTP_403_FORBIDDEN)
+        return super().list(request, *args, **kwargs)
+    
+    def get_queryset(self):
+        return ReviewEdit.objects.filter(review_id=self.kwargs['review_id'])
 
 
 @extend_schema(
@@ -200,7 +550,7 @@ class ReviewDetailView(generics.RetrieveAPIView):
     responses={200: AdminReviewWithModerationSerializer(many=True)},
     tags=["Moderation"]
 )
-class AdminReviewsWithModerationView(generics.ListAPIView):
+class AdminReviewsWithModerationView(ReadReplicaMixin, generics.ListAPIView):
     """
     Admin-only endpoint to get reviews with their moderation data
     Optional query parameters:
@@ -209,12 +559,14 @@ class AdminReviewsWithModerationView(generics.ListAPIView):
     - ?spam=true - show only spam reviews
     - ?spam=false - show only non-spam reviews
     - Parameters can be combined: ?flagged=true&spam=false
+    - ?limit=50&offset=100 - paginate, the total count comes from precomputed counters
     """
     serializer_class = AdminReviewWithModerationSerializer
     permission_classes = [IsSuperUser]
+    pagination_class = CountedLimitOffsetPagination
     
     def get_queryset(self):
-        queryset = Review.objects.select_related('moderation_result').all()
+        queryset = Review.objects.select_related('moderation_result').order_by('id')
         
         flagged = self.request.query_params.get('flagged', None)
         if flagged is not None:
@@ -238,6 +590,22 @@ class AdminReviewsWithModerationView(generics.ListAPIView):
         
         return queryset
 
+    def get_precomputed_count(self):
+        filters = {}
+        for name in ('flagged', 'spam'):
+            value = self.request.query_params.get(name, '').lower()
+            filters[name] = value if value in ('true', 'false') else None
+        return count_admin_reviews(**filters)
+    
+    def list(self, request, *args, **kwargs):
+        if not settings.ADMIN_REVIEWS_FAST_PATH:
+            return super().list(request, *args, **kwargs)
+        rows = admin_review_rows(self.get_queryset())
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(serialize_admin_review_rows(page))
+        return Response(serialize_admin_review_rows(rows))
+
 
 @extend_schema(
     operation_id="admin_get_ai_service_errors",
@@ -260,7 +628,7 @@ class AdminReviewsWithModerationView(generics.ListAPIView):
     responses={200: AIServiceErrorSerializer(many=True)},
     tags=["Monitoring"]
 )
-class AIServiceErrorListView(generics.ListAPIView):
+class AIServiceErrorListView(ReadReplicaMixin, generics.ListAPIView):
     """
     Admin-only endpoint to get AI service errors for monitoring
     Optional query parameters:
@@ -286,6 +654,14 @@ class AIServiceErrorListView(generics.ListAPIView):
             limit = 50
             
         return queryset[:limit]
+    
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        service = request.query_params.get('service', None)
+        total = get_counter(errors_counter(service) if service in ['moderation', 'spam_detection'] else ERRORS_TOTAL)
+        if total is not None:
+            response['X-Total-Count'] = total
+        return response
 
 
 @extend_schema(
@@ -305,4 +681,215 @@ class AIServiceErrorDetailView(generics.RetrieveAPIView):
     serializer_class = AIServiceErrorSerializer
     permission_classes = [IsSuperUser]
     lookup_field = 'id'
-    lookup_url_kwarg = 'error_id'
\ No newline at end of file
+    lookup_url_kwarg = 'error_id'
+
+
+class BulkModerationOverrideView(APIView):
+    """
+    Admin-only endpoint to correct the verdicts of many reviews at once
+    - Target reviews by "review_ids" or by a "filter" expression
+      (flagged, spam, user_id, created_after, created_before, min_spam_probability)
+    - Set "flagged" and/or "is_spam", with an optional "reason" for the audit trail
+    - Reviews without a moderation result are left untouched
+    """
+    permission_classes = [IsSuperUser]
+    
+    @extend_schema(
+        operation_id="admin_bulk_override_moderation",
+        request=BulkModerationOverrideSerializer,
+        description="Override flag/spam verdicts for many reviews with one update (Admin only)",
+        responses={
+            200: "Overridden review IDs",
+            400: "Validation errors"
+        },
+        tags=["Moderation"]
+    )
+    def post(self, request):
+        from .services.overrides import apply_overrides
+        
+        serializer = BulkModerationOverrideSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        data = serializer.validated_data
+        review_ids = apply_overrides(
+            request.user,
+            review_ids=data.get('review_ids'),
+            filters=data.get('filter'),
+            flagged=data.get('flagged'),
+            is_spam=data.get('is_spam'),
+            reason=data['reason'],
+        )
+        response = {'updated': len(review_ids), 'review_ids': review_ids}
+        if 'review_ids' in data:
+            response['skipped_review_ids'] = sorted(set(data['review_ids']) - set(review_ids))
+        return Response(response)
+
+
+@extend_schema(
+    operation_id="admin_get_moderation_failures",
+    description="List moderations that failed on an external service (Admin only). "
+                "Defaults to the dead letters, use ?status=retrying for the ones still being retried.",
+    parameters=[
+        OpenApiParameter(
+            name='status',
+            description='Failure status',
+            required=False,
+            type=OpenApiTypes.STR,
+            enum=['dead', 'retrying'],
+        ),
+    ],
+    responses={200: ModerationFailureSerializer(many=True)},
+    tags=["Moderation"]
+)
+class ModerationFailureListView(generics.ListAPIView):
+    """
+    Admin-only endpoint to inspect failed moderations, paginated with ?limit= and ?offset=
+    """
+    serializer_class = ModerationFailureSerializer
+    permission_classes = [IsSuperUser]
+    pagination_class = CountedLimitOffsetPagination
+    
+    def get_queryset(self):
+        return ModerationFailure.objects.select_related('review').filter(
+            status=self.request.query_params.get('status', 'dead')
+        )
+
+
+class ModerationFailureRequeueView(APIView):
+    """
+    Admin-only endpoint to queue dead-lettered moderations again,
+    by "ids" or all of them with "all": true
+    """
+    permission_classes = [IsSuperUser]
+    
+    @extend_schema(
+        operation_id="admin_requeue_moderation_failures",
+        request=RequeueModerationFailuresSerializer,
+        description="Requeue dead-lettered moderations with a fresh set of attempts (Admin only)",
+        responses={
+            200: "Requeued review IDs",
+            400: "Validation errors"
+        },
+        tags=["Moderation"]
+    )
+    def post(self, request):
+        from .services.retries import requeue_failures
+        
+        serializer = RequeueModerationFailuresSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        review_ids = requeue_failures(serializer.validated_data.get('ids'))
+        return Response({'requeued': len(review_ids), 'review_ids': review_ids})
+
+
+class ModerationPolicyStatsView(APIView):
+    """
+    Admin-only endpoint to audit the trust-based moderation policy
+    """
+    permission_classes = [IsSuperUser]
+    
+    @extend_schema(
+        operation_id="admin_get_moderation_policy_stats",
+        description="Get moderation counts per policy and the external calls avoided (Admin only)",
+        responses={200: "Moderation policy statistics"},
+        tags=["Moderation"]
+    )
+    def get(self, request):
+        from .services.reputation import policy_stats
+        
+        return Response(policy_stats())
+
+
+class ModerationPipelineStatsView(APIView):
+    """
+    Admin-only endpoint to inspect per-stage timing and hit rates of the moderation pipeline
+    """
+    permission_classes = [IsSuperUser]
+    
+    @extend_schema(
+        operation_id="admin_get_moderation_pipeline_stats",
+        description="Get calls, hit rate and mean latency per moderation stage (Admin only)",
+        responses={200: "Moderation pipeline statistics"},
+        tags=["Moderation"]
+    )
+    def get(self, request):
+        return Response({
+            'pipeline': settings.MODERATION_PIPELINE,
+            'stages': stage_stats(settings.MODERATION_PIPELINE),
+            'counters': counters(),
+        })
+
+
+class AdminReviewTraceView(APIView):
+    """
+    Admin-only endpoint to inspect the timed spans of a review's moderation,
+    from the request that created it through Celery to the saved result
+    """
+    permission_classes = [IsSuperUser]
+
+    @extend_schema(
+        operation_id="admin_get_review_trace",
+        description="Get the trace spans recorded for a review (Admin only)",
+        responses={
+            200: "Review trace",
+            404: "No trace recorded for this review",
+            503: "Trace store unavailable"
+        },
+        tags=["Moderation"]
+    )
+    def get(self, request, review_id):
+        try:
+            spans = get_review_trace(review_id)
+        except RedisError:
+            return Response(
+                {'error': 'Trace store is unavailable, try again later'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+        if not spans:
+            return Response(
+                {'error': 'No trace recorded for this review, it was not sampled or has expired'},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        start = spans[0]['start']
+        end = max(entry['start'] + entry['duration_ms'] / 1000 for entry in spans)
+        return Response({
+            'review_id': review_id,
+            'trace_ids': sorted({entry['trace_id'] for entry in spans}),
+            'duration_ms': round((end - start) * 1000, 3),
+            'spans': spans,
+        })
+
+
+class AnalyticsSnapshotListView(generics.ListAPIView):
+    """
+    Admin-only endpoint to list columnar analytics snapshots (GET)
+    and start a new incremental snapshot in the background (POST)
+    """
+    queryset = AnalyticsSnapshot.objects.all()
+    serializer_class = AnalyticsSnapshotSerializer
+    permission_classes = [IsSuperUser]
+    
+    @extend_schema(
+        operation_id="admin_get_analytics_snapshots",
+        description="List analytics snapshots and their watermarks (Admin only)",
+        tags=["Analytics"]
+    )
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+    
+    @extend_schema(
+        operation_id="admin_create_analytics_snapshot",
+        request=None,
+        description="Start an incremental Parquet snapshot of reviews and moderation scores (Admin only)",
+        responses={202: AnalyticsSnapshotSerializer},
+        tags=["Analytics"]
+    )
+    def post(self, request):
+        from .tasks import analytics_snapshot_task
+        
+        snapshot = AnalyticsSnapshot.objects.create()
+        transaction.on_commit(lambda: analytics_snapshot_task.delay(snapshot.id))
+        return Response(AnalyticsSnapshotSerializer(snapshot).data, status=status.HTTP_202_ACCEPTED)
+
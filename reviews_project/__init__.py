@@ -1,5 +1,10 @@
-# This will make sure the app is always imported when
-# Django starts so that shared_task will use this app.
-from .celery import app as celery_app
-
+# The Celery app is loaded on first use rather than when Django starts,
+# reviews.tasks imports it so shared_task always uses this app.
 __all__ = ("celery_app",)
+
+
+def __getattr__(name):
+    if name == "celery_app":
+        from .celery import app
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,6 +1,11 @@
+import functools
+from pathlib import Path
+from django.conf import settings
 from django.contrib import admin
+from django.http import HttpResponse
 from django.urls import path, include
-from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView, SpectacularRedocView
+from django.utils.module_loading import import_string
+from django.views.decorators.csrf import csrf_exempt
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from drf_spectacular.utils import extend_schema
 
@@ -17,6 +22,40 @@ class CustomTokenRefreshView(TokenRefreshView):
         return super().post(request, *args, **kwargs)
 
 
+def lazy_view(view_path, **initkwargs):
+    """
+    Class-based view imported on its first request instead of at startup
+    """
+    @functools.cache
+    def load():
+        return import_string(view_path).as_view(**initkwargs)
+
+    @csrf_exempt
+    def view(request, *args, **kwargs):
+        return load()(request, *args, **kwargs)
+    return view
+
+
+@functools.cache
+def read_schema(path):
+    return Path(path).read_bytes()
+
+
+def schema_view(request, *args, **kwargs):
+    """
+    Serve the schema generated at build time with
+    `manage.py spectacular --file <OPENAPI_SCHEMA_FILE>`,
+    falling back to generating it per request when the file is missing
+    """
+    if Path(settings.OPENAPI_SCHEMA_FILE).is_file():
+        return HttpResponse(read_schema(settings.OPENAPI_SCHEMA_FILE),
+                            content_type='application/vnd.oai.openapi; charset=utf-8')
+    return generated_schema_view(request, *args, **kwargs)
+
+
+generated_schema_view = lazy_view('drf_spectacular.views.SpectacularAPIView')
+
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('reviews.urls')),
@@ -24,7 +63,7 @@ urlpatterns = [
     path('api/token/', CustomTokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/token/refresh/', CustomTokenRefreshView.as_view(), name='token_refresh'),
 
-    path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
-    path('api/docs/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
-    path('api/redoc/', SpectacularRedocView.as_view(url_name='schema'), name='redoc'),
+    path('api/schema/', schema_view, name='schema'),
+    path('api/docs/', lazy_view('drf_spectacular.views.SpectacularSwaggerView', url_name='schema'), name='swagger-ui'),
+    path('api/redoc/', lazy_view('drf_spectacular.views.SpectacularRedocView', url_name='schema'), name='redoc'),
 ]